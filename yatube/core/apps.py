@@ -8,3 +8,13 @@ class CoreConfig(AppConfig):
     """
 
     name = 'core'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+
+        from . import checks, signals  # noqa: F401
+        from .counts import track_row_counts
+
+        # Регистрирует фоновые задачи из модулей tasks приложений.
+        autodiscover_modules('tasks')
+        track_row_counts()
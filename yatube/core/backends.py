@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'auth_user.{}'
+
+
+def user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+class CachedModelBackend(ModelBackend):
+    """Бэкенд аутентификации, который кеширует пользователя.
+
+    AuthenticationMiddleware вызывает get_user на каждый запрос;
+    с этим бэкендом запрос к таблице пользователей выполняется
+    только после истечения USER_CACHE_TIMEOUT или изменения
+    пользователя (см. core.signals). Нулевой таймаут отключает
+    кеш: без общего кеша сброс виден только в своём процессе.
+    """
+
+    def get_user(self, user_id):
+        if not settings.USER_CACHE_TIMEOUT:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Без общего кеша лимиты и кеши действуют в пределах процесса."""
+    if settings.SHARED_CACHE:
+        return []
+    return [
+        Warning(
+            'Кеш не общий для процессов сервера.',
+            hint=(
+                'Задайте YATUBE_CACHE_LOCATION: без общего кеша лимиты '
+                'запросов умножаются на число процессов, а изменения '
+                'пользователей и счётчиков видны только в своём процессе.'
+            ),
+            id='core.W001',
+        )
+    ]
@@ -0,0 +1,118 @@
+import gzip
+import io
+import secrets
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli необязателен
+    brotli = None
+
+# Форматы, которые уже сжаты: повторное сжатие только тратит CPU.
+INCOMPRESSIBLE_EXTENSIONS = frozenset(
+    (
+        '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico',
+        '.woff', '.woff2', '.gz', '.br', '.zip',
+    )
+)
+
+
+def available_encodings():
+    """Возвращает поддерживаемые кодировки в порядке предпочтения."""
+    if brotli is not None:
+        return ('br', 'gzip')
+    return ('gzip',)
+
+
+def accepted_encodings(accept_encoding):
+    """Разбирает заголовок Accept-Encoding в множество кодировок,
+    отбрасывая помеченные q=0."""
+    accepted = set()
+    for item in accept_encoding.split(','):
+        parts = item.strip().split(';')
+        encoding = parts[0].strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(encoding)
+    return accepted
+
+
+def choose_encoding(accept_encoding, encodings=None):
+    """Выбирает лучшую кодировку, которую принимает клиент."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in encodings or available_encodings():
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def gzip_compress(data, level=9):
+    """Сжимает данные gzip с нулевым mtime, чтобы результат
+    был воспроизводимым между сборками."""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+        fileobj=buffer, mode='wb', compresslevel=level, mtime=0
+    ) as gzip_file:
+        gzip_file.write(data)
+    return buffer.getvalue()
+
+
+def brotli_compress(data, level=11):
+    return brotli.compress(data, quality=level)
+
+
+def compress(data, encoding, level=None):
+    """Сжимает данные указанной кодировкой."""
+    if encoding == 'br':
+        return brotli_compress(data, 11 if level is None else level)
+    if encoding == 'gzip':
+        return gzip_compress(data, 9 if level is None else level)
+    raise ValueError(f'Неизвестная кодировка: {encoding}')
+
+
+def breach_padding(max_length):
+    """HTML-комментарий случайной длины от 0 до max_length символов.
+
+    Случайная длина сжатого ответа мешает атаке BREACH подбирать
+    секреты страницы по размеру ответа.
+    """
+    length = secrets.randbelow(max_length + 1)
+    return b'<!-- ' + secrets.token_urlsafe(length)[:length].encode() + b' -->'
+
+
+def compress_stream(chunks, encoding, level=None):
+    """Сжимает последовательность фрагментов на лету.
+
+    После каждого фрагмента выполняется flush, чтобы клиент
+    получал данные сразу, а не после заполнения буфера.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=5 if level is None else level)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    elif encoding == 'gzip':
+        # wbits=31 — формат gzip с заголовком и контрольной суммой.
+        compressor = zlib.compressobj(
+            6 if level is None else level, zlib.DEFLATED, 31
+        )
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+            if data:
+                yield data
+        yield compressor.flush()
+    else:
+        raise ValueError(f'Неизвестная кодировка: {encoding}')
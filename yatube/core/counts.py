@@ -0,0 +1,157 @@
+import hashlib
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+
+from .models import RowCount
+
+COUNT_KEY = 'count.{}'
+
+
+def explain_estimate(queryset):
+    """Оценка числа строк по плану запроса PostgreSQL.
+    Выполняется без чтения таблицы, по статистике планировщика."""
+    compiler = queryset.query.get_compiler(queryset.db)
+    sql, params = compiler.as_sql()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def table_rows(model, using):
+    """Число строк таблицы без COUNT(*): reltuples на PostgreSQL,
+    таблица счётчиков RowCount на остальных базах."""
+    table = model._meta.db_table
+    if connections[using].vendor == 'postgresql':
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                (table,),
+            )
+            rows = cursor.fetchone()[0]
+        # До первого ANALYZE reltuples равен -1 или 0.
+        return rows if rows > 0 else None
+    rows = (
+        RowCount.objects.filter(table=table)
+        .values_list('rows', flat=True)
+        .first()
+    )
+    if rows is None:
+        rows = model._base_manager.count()
+        RowCount.objects.bulk_create(
+            (RowCount(table=table, rows=rows),), ignore_conflicts=True
+        )
+    return rows
+
+
+def where_sql(queryset):
+    compiler = queryset.query.get_compiler(queryset.db)
+    try:
+        return compiler.compile(queryset.query.where)
+    except EmptyResultSet:
+        return None
+
+
+def is_whole_table(queryset):
+    """Выбирает ли queryset всю таблицу или всё, что отдаёт
+    менеджер по умолчанию.
+
+    Ленты читают через менеджер, скрывающий удалённые строки.
+    table_rows считает и скрытые строки, но их немного и они
+    вычищаются фоновой очисткой, так что оценка лишь немного
+    завышена.
+    """
+    model = queryset.model
+    where = where_sql(queryset) or ('', ())
+    for manager in (model._base_manager, model._default_manager):
+        sql, params = where_sql(manager.all()) or ('', ())
+        if where[0] == sql and tuple(where[1]) == tuple(params):
+            return True
+    return False
+
+
+def cached_count(queryset):
+    """Точное число строк, закешированное на COUNT_CACHE_TIMEOUT."""
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    key = COUNT_KEY.format(
+        hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def estimated_count(queryset, threshold=None):
+    """Количество строк queryset: точное для небольших выборок,
+    оценочное для больших.
+
+    Сначала считается не больше threshold + 1 строк, поэтому
+    стоимость точного подсчёта ограничена. Если строк больше,
+    для всей таблицы берётся table_rows, для выборки с условиями
+    на PostgreSQL — оценка планировщика, на остальных базах —
+    закешированный точный подсчёт.
+    """
+    if threshold is None:
+        threshold = settings.COUNT_ESTIMATE_THRESHOLD
+    queryset = queryset.order_by()
+    capped = queryset[:threshold + 1].count()
+    if capped <= threshold:
+        return capped
+    estimate = None
+    if is_whole_table(queryset):
+        estimate = table_rows(queryset.model, queryset.db)
+    if estimate is None:
+        if connections[queryset.db].vendor == 'postgresql':
+            estimate = explain_estimate(queryset)
+        else:
+            estimate = cached_count(queryset)
+    return max(estimate, capped)
+
+
+def refresh_row_counts():
+    """Пересчитывает RowCount точно, например после bulk_create,
+    который не отправляет сигналов."""
+    for model in counted_models():
+        RowCount.objects.update_or_create(
+            table=model._meta.db_table,
+            defaults={'rows': model._base_manager.count()},
+        )
+
+
+def counted_models():
+    return [apps.get_model(label) for label in settings.COUNTED_MODELS]
+
+
+def row_added(sender, instance, created, **kwargs):
+    if created:
+        RowCount.objects.filter(table=sender._meta.db_table).update(
+            rows=F('rows') + 1
+        )
+
+
+def row_removed(sender, instance, **kwargs):
+    RowCount.objects.filter(table=sender._meta.db_table).update(
+        rows=F('rows') - 1
+    )
+
+
+def track_row_counts():
+    """Подключает счётчики строк к моделям из COUNTED_MODELS.
+    На PostgreSQL не нужны: там есть статистика планировщика."""
+    if connections['default'].vendor == 'postgresql':
+        return
+    for model in counted_models():
+        post_save.connect(row_added, sender=model)
+        post_delete.connect(row_removed, sender=model)
@@ -0,0 +1,57 @@
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Бэкенд PostgreSQL с пулом соединений psycopg2.
+
+    Django открывает соединение на поток и закрывает его после
+    CONN_MAX_AGE секунд; здесь закрытие возвращает соединение
+    в пул процесса, а открытие берёт готовое из пула. Размер
+    пула задаётся ключом POOL настроек базы:
+    {'MIN_SIZE': 1, 'MAX_SIZE': 20}. MAX_SIZE должен быть не
+    меньше числа потоков процесса.
+    """
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            connection_pool = _pools.get(self.alias)
+            if connection_pool is None:
+                options = self.settings_dict.get('POOL', {})
+                connection_pool = pool.ThreadedConnectionPool(
+                    options.get('MIN_SIZE', 1),
+                    options.get('MAX_SIZE', 20),
+                    **conn_params,
+                )
+                _pools[self.alias] = connection_pool
+        return connection_pool
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).getconn()
+
+        # Как в базовом бэкенде: уровень изоляции берётся из OPTIONS
+        # или из значения по умолчанию для базы.
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Пул сам откатывает незавершённую транзакцию
+                # и закрывает сломанные соединения.
+                _pools[self.alias].putconn(
+                    self.connection, close=bool(self.connection.closed)
+                )
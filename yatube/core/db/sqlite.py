@@ -0,0 +1,57 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+
+def apply_pragmas(cursor, pragmas):
+    """Выполняет PRAGMA для соединения с SQLite."""
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Обработчик connection_created: включает WAL и настраивает
+    соединение с SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def retry_on_lock(attempts=5, delay=0.05):
+    """Выполняет view в транзакции и повторяет её при блокировке SQLite.
+
+    busy_timeout не помогает, когда читающая транзакция пытается
+    стать пишущей при устаревшем снимке WAL: SQLite сразу
+    возвращает SQLITE_BUSY. Транзакция откатывается целиком, поэтому
+    повтор не дублирует уже выполненные записи, а on_commit-действия
+    срабатывают один раз. Внутри чужой транзакции повторять нечего:
+    view выполняется один раз.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            if connection.in_atomic_block:
+                with transaction.atomic():
+                    return view_func(*args, **kwargs)
+            for attempt in range(attempts):
+                try:
+                    with transaction.atomic():
+                        return view_func(*args, **kwargs)
+                except OperationalError as error:
+                    if not is_lock_error(error) or attempt == attempts - 1:
+                        raise
+                time.sleep(delay * 2 ** attempt * random.uniform(0.5, 1.5))
+
+        return wrapper
+
+    return decorator
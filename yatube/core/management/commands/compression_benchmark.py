@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import Group, User
+
+from ...compression import available_encodings, compress
+
+DEFAULT_LEVELS = {
+    'br': (1, 4, 5, 8, 11),
+    'gzip': (1, 4, 6, 9),
+}
+
+
+class Command(BaseCommand):
+    """Сравнивает затраты CPU и экономию трафика при сжатии
+    типичных страниц ленты разными кодировками и уровнями."""
+
+    help = 'Бенчмарк сжатия HTML страниц ленты'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help='Адрес страницы (можно указать несколько раз).',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество повторов сжатия каждой страницы.',
+        )
+
+    def default_urls(self):
+        urls = [reverse('posts:index')]
+        group = Group.objects.first()
+        if group is not None:
+            urls.append(reverse('posts:group_list', args=(group.slug,)))
+        author = User.objects.filter(posts__isnull=False).first()
+        if author is not None:
+            urls.append(reverse('posts:profile', args=(author.username,)))
+        return urls
+
+    def handle(self, *args, **options):
+        client = Client()
+        repeat = options['repeat']
+        for url in options['urls'] or self.default_urls():
+            response = client.get(url)
+            if response.status_code != 200:
+                self.stderr.write(f'{url}: статус {response.status_code}')
+                continue
+            # Клиент не шлёт Accept-Encoding, поэтому контент не сжат.
+            content = response.content
+            self.stdout.write(f'{url}: {len(content)} байт')
+            # process_time считает только CPU процесса: результат
+            # не зависит от нагрузки на машину и переключений потоков.
+            for encoding in available_encodings():
+                for level in DEFAULT_LEVELS[encoding]:
+                    started = time.process_time()
+                    for _ in range(repeat):
+                        compressed = compress(content, encoding, level)
+                    elapsed = (time.process_time() - started) / repeat
+                    saved = len(content) - len(compressed)
+                    self.stdout.write(
+                        f'  {encoding:>4} level={level:<2} '
+                        f'{len(compressed):>8} байт '
+                        f'сэкономлено={saved / len(content):6.1%} '
+                        f'время={elapsed * 1000:7.3f} мс'
+                    )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...counts import refresh_row_counts
+
+
+class Command(BaseCommand):
+    """Точно пересчитывает счётчики строк RowCount. Запускается
+    по расписанию или после массового импорта в обход сигналов."""
+
+    help = 'Пересчёт счётчиков строк больших таблиц'
+
+    def handle(self, *args, **options):
+        refresh_row_counts()
+        self.stdout.write('Счётчики строк пересчитаны')
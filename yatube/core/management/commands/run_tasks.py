@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...tasks import run_pending, start_workers
+
+
+class Command(BaseCommand):
+    """Воркер фоновой очереди задач. Брокер не нужен: задачи
+    хранятся в основной базе. Для нескольких процессов достаточно
+    запустить команду несколько раз."""
+
+    help = 'Выполнение фоновых задач из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.TASK_WORKERS,
+            help='Количество потоков-воркеров.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.TASK_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить доступные задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = run_pending()
+            self.stdout.write(f'Выполнено задач: {processed}')
+            return
+        stop, threads = start_workers(
+            options['workers'], options['poll_interval']
+        )
+        self.stdout.write(f'Запущено воркеров: {len(threads)}')
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
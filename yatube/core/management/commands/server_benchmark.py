@@ -0,0 +1,99 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+
+def wsgi_request(application, path):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'localhost'}
+    setup_testing_defaults(environ)
+    environ['wsgi.errors'] = io.StringIO()
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    body = b''.join(application(environ, start_response))
+    return statuses[0], len(body)
+
+
+async def asgi_request(application, path):
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status'], sum(
+        len(message.get('body', b'')) for message in messages[1:]
+    )
+
+
+class Command(BaseCommand):
+    """Сравнивает пропускную способность ленты через WSGI
+    и через ASGI-приложение yatube.asgi при одинаковой
+    степени параллелизма."""
+
+    help = 'Бенчмарк WSGI и ASGI точек входа'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        from yatube.asgi import application as asgi_application
+
+        path = options['path']
+        total = options['requests']
+        concurrency = options['concurrency']
+
+        wsgi_application = get_wsgi_application()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(
+                executor.map(
+                    lambda _: wsgi_request(wsgi_application, path),
+                    range(total),
+                )
+            )
+        self.report('WSGI', total, time.perf_counter() - started)
+
+        async def run_asgi():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def limited():
+                async with semaphore:
+                    return await asgi_request(asgi_application, path)
+
+            await asyncio.gather(*(limited() for _ in range(total)))
+
+        started = time.perf_counter()
+        asyncio.run(run_asgi())
+        self.report('ASGI', total, time.perf_counter() - started)
+
+    def report(self, name, total, elapsed):
+        self.stdout.write(
+            f'{name}: {total} запросов за {elapsed:.2f} с, '
+            f'{total / elapsed:.1f} запросов/с'
+        )
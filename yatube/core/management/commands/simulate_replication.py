@@ -0,0 +1,57 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    """Имитирует асинхронную репликацию для локальной разработки:
+    раз в --lag секунд копирует основную SQLite-базу в файлы реплик.
+    Пока копия не обновилась, реплики отдают устаревшие данные."""
+
+    help = 'Копирование основной SQLite-базы в реплики с задержкой'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lag',
+            type=float,
+            default=2,
+            help='Задержка репликации в секундах.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Скопировать один раз и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте YATUBE_SQLITE_REPLICAS.'
+            )
+        primary = connections['default'].settings_dict['NAME']
+        while True:
+            if not options['once']:
+                time.sleep(options['lag'])
+            self.replicate(primary)
+            if options['once']:
+                return
+
+    def replicate(self, primary):
+        source = sqlite3.connect(primary)
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                target = sqlite3.connect(
+                    connections[alias].settings_dict['NAME']
+                )
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+        finally:
+            source.close()
+        self.stdout.write(
+            f'Реплики обновлены: {", ".join(settings.DATABASE_REPLICAS)}'
+        )
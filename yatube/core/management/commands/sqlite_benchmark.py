@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...db.sqlite import apply_pragmas, is_lock_error
+
+
+class Command(BaseCommand):
+    """Сравнивает пропускную способность SQLite при конкурентных
+    чтении и записи с настройками по умолчанию и с SQLITE_PRAGMAS.
+
+    Читатели выбирают последние строки, как лента, писатели
+    вставляют строки, как add_comment; считаются успешные операции
+    и ошибки «database is locked».
+    """
+
+    help = 'Бенчмарк конкурентного доступа к SQLite'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        for title, pragmas in (
+            ('По умолчанию', {}),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+        ):
+            reads, writes, errors = self.run(pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{title}: чтений {reads / seconds:.0f}/с, '
+                f'записей {writes / seconds:.0f}/с, '
+                f'ошибок блокировки {errors}'
+            )
+
+    def connect(self, path, pragmas):
+        # Базовый вариант ждёт блокировку стандартные для sqlite3 5 секунд,
+        # SQLITE_PRAGMAS переопределяют ожидание через busy_timeout.
+        connection = sqlite3.connect(path, isolation_level=None)
+        apply_pragmas(connection.cursor(), pragmas)
+        return connection
+
+    def run(self, pragmas, options):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'benchmark.sqlite3')
+        setup = self.connect(path, pragmas)
+        setup.execute(
+            'CREATE TABLE comment (id INTEGER PRIMARY KEY, text TEXT)'
+        )
+        setup.executemany(
+            'INSERT INTO comment (text) VALUES (?)',
+            (('x' * 200,) for _ in range(10000)),
+        )
+        setup.close()
+
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def worker(statement, params, counter):
+            connection = self.connect(path, pragmas)
+            done = failed = 0
+            while time.monotonic() < deadline:
+                try:
+                    connection.execute('BEGIN')
+                    connection.execute(statement, params).fetchall()
+                    connection.execute('COMMIT')
+                    done += 1
+                except sqlite3.OperationalError as error:
+                    if not is_lock_error(error):
+                        raise
+                    failed += 1
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+            connection.close()
+            with lock:
+                counters[counter] += done
+                counters['errors'] += failed
+
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(
+                    'SELECT * FROM comment ORDER BY id DESC LIMIT 10',
+                    (),
+                    'reads',
+                ),
+            )
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=worker,
+                args=(
+                    'INSERT INTO comment (text) VALUES (?)',
+                    ('y' * 200,),
+                    'writes',
+                ),
+            )
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+        return counters['reads'], counters['writes'], counters['errors']
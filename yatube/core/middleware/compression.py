@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from ..compression import (
+    breach_padding,
+    choose_encoding,
+    compress,
+    compress_stream,
+)
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+# События должны уходить клиенту сразу, а сжатие копит их в буфере.
+UNCOMPRESSED_CONTENT_TYPES = ('text/event-stream',)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы brotli или gzip в зависимости от Accept-Encoding.
+
+    Уровни сжатия задаются в COMPRESSION_LEVELS, ответы короче
+    COMPRESSION_MIN_SIZE отдаются как есть. Потоковые ответы
+    сжимаются по мере генерации.
+
+    Сжатие страниц с секретами уязвимо для BREACH. Токен CSRF
+    Django маскирует заново в каждом ответе, а к HTML с формой
+    дополнительно добавляется комментарий случайной длины
+    (до COMPRESSION_PADDING символов).
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return response
+        if content_type.startswith(UNCOMPRESSED_CONTENT_TYPES):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+        level = settings.COMPRESSION_LEVELS.get(encoding)
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level
+            )
+            del response['Content-Length']
+        else:
+            content = response.content
+            if (
+                settings.COMPRESSION_PADDING
+                and request.META.get('CSRF_COOKIE_USED')
+                and content_type.startswith('text/html')
+            ):
+                content += breach_padding(settings.COMPRESSION_PADDING)
+            compressed_content = compress(content, encoding, level)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response['Content-Length'] = str(len(response.content))
+
+        # Сильный ETag после сжатия должен стать слабым (RFC 7232).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+
+        return response
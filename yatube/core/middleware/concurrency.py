@@ -0,0 +1,85 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from ..views import too_many_requests
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - flock есть только в POSIX
+    fcntl = None
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+POLL_INTERVAL = 0.01
+
+
+class WriteSlots:
+    """Слоты записи на файловых блокировках flock.
+
+    Блокировка принадлежит открытому файлу, поэтому слоты общие
+    для всех процессов и потоков сервера на этой машине и
+    освобождаются сами, если процесс завершился.
+    """
+
+    def __init__(self, directory, count):
+        os.makedirs(directory, exist_ok=True)
+        self.paths = [
+            os.path.join(directory, f'slot{index}.lock')
+            for index in range(count)
+        ]
+
+    def acquire(self, timeout):
+        """Занимает свободный слот и возвращает его дескриптор
+        или None, если за timeout секунд слот не освободился."""
+        deadline = time.monotonic() + timeout
+        while True:
+            for path in self.paths:
+                fd = os.open(path, os.O_CREAT | os.O_RDWR)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                else:
+                    return fd
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def release(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class WriteConcurrencyMiddleware:
+    """Ограничивает число одновременно выполняемых запросов на запись.
+
+    SQLite допускает только одного пишущего, поэтому лишние
+    писатели ждут блокировку и тормозят чтение. Ограничение общее
+    для всех процессов сервера (см. WriteSlots). Запрос, который
+    не дождался свободного слота за WRITE_QUEUE_TIMEOUT секунд,
+    получает 429 до обращения к базе. На других базах и без flock
+    middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        if fcntl is None or connection.vendor != 'sqlite':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slots = WriteSlots(
+            settings.WRITE_LOCK_DIR, settings.WRITE_CONCURRENCY_LIMIT
+        )
+        self.timeout = settings.WRITE_QUEUE_TIMEOUT
+
+    def __call__(self, request):
+        if request.method not in WRITE_METHODS:
+            return self.get_response(request)
+        fd = self.slots.acquire(self.timeout)
+        if fd is None:
+            return too_many_requests(request, 1)
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release(fd)
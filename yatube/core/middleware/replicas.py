@@ -0,0 +1,35 @@
+from django.conf import settings
+
+from ..routers import has_written, pin_to_primary, reset
+
+PIN_COOKIE = 'pin_primary'
+
+
+class ReplicaPinningMiddleware:
+    """Обеспечивает чтение своих записей при работе с репликами.
+
+    После запроса, который что-то записал в основную базу,
+    клиент получает cookie, и в течение REPLICA_PIN_SECONDS
+    его запросы читают из основной базы, а не из реплик.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset()
+        if PIN_COOKIE in request.COOKIES:
+            pin_to_primary()
+        try:
+            response = self.get_response(request)
+            if has_written() and settings.DATABASE_REPLICAS:
+                response.set_cookie(
+                    PIN_COOKIE,
+                    '1',
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                    samesite='Lax',
+                )
+        finally:
+            reset()
+        return response
@@ -0,0 +1,97 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+from ..compression import available_encodings, choose_encoding
+from ..storage import ENCODING_SUFFIXES
+
+# Имя вида style.1a2b3c4d5e6f.css, которое генерирует
+# ManifestStaticFilesStorage: содержимое по такому адресу не меняется.
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+class PrecompressedStaticMiddleware:
+    """Отдаёт файлы из STATIC_ROOT без обращения к view-слою.
+
+    Если клиент принимает br или gzip и рядом с файлом лежит
+    подготовленный при collectstatic вариант, отдаётся он.
+    Файлы с хешем в имени кешируются браузером навсегда.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = settings.STATIC_ROOT
+        self.max_age = settings.STATIC_MAX_AGE
+        self.immutable_max_age = settings.STATIC_IMMUTABLE_MAX_AGE
+
+    def __call__(self, request):
+        if (
+            self.root
+            and request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            response = self.serve(
+                request, request.path_info[len(self.prefix):]
+            )
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def find_variants(self, path):
+        """Возвращает {кодировка: путь} для сжатых копий файла."""
+        return {
+            encoding: path + ENCODING_SUFFIXES[encoding]
+            for encoding in available_encodings()
+            if os.path.isfile(path + ENCODING_SUFFIXES[encoding])
+        }
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except ValueError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        variants = self.find_variants(path)
+        encoding = None
+        if variants:
+            encoding = choose_encoding(
+                request.META.get('HTTP_ACCEPT_ENCODING', ''),
+                tuple(variants),
+            )
+        file_path = variants[encoding] if encoding else path
+        stat = os.stat(file_path)
+        etag = '"{:x}-{:x}{}"'.format(
+            int(stat.st_mtime), stat.st_size,
+            f'-{encoding}' if encoding else '',
+        )
+
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(path)
+            response = FileResponse(
+                open(file_path, 'rb'),
+                content_type=content_type or 'application/octet-stream',
+            )
+            response['Last-Modified'] = http_date(stat.st_mtime)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        if HASHED_NAME_RE.search(name):
+            response['Cache-Control'] = (
+                f'public, max-age={self.immutable_max_age}, immutable'
+            )
+        else:
+            response['Cache-Control'] = f'public, max-age={self.max_age}'
+        if variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
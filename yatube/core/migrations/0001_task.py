@@ -0,0 +1,89 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'name',
+                    models.CharField(
+                        max_length=200, verbose_name='Имя задачи'
+                    ),
+                ),
+                ('payload', models.TextField(verbose_name='Аргументы в JSON')),
+                (
+                    'priority',
+                    models.SmallIntegerField(
+                        default=0, verbose_name='Приоритет'
+                    ),
+                ),
+                (
+                    'attempts',
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name='Попыток'
+                    ),
+                ),
+                (
+                    'max_attempts',
+                    models.PositiveSmallIntegerField(
+                        default=3, verbose_name='Максимум попыток'
+                    ),
+                ),
+                (
+                    'available_at',
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name='Доступна с',
+                    ),
+                ),
+                (
+                    'failed',
+                    models.BooleanField(
+                        default=False, verbose_name='Завершилась ошибкой'
+                    ),
+                ),
+                (
+                    'last_error',
+                    models.TextField(
+                        blank=True, verbose_name='Последняя ошибка'
+                    ),
+                ),
+                (
+                    'created',
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name='Дата создания'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Задача',
+                'verbose_name_plural': 'Задачи',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(
+                fields=['failed', '-priority', 'available_at'],
+                name='task_queue_idx',
+            ),
+        ),
+    ]
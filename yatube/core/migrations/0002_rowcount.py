@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RowCount',
+            fields=[
+                (
+                    'table',
+                    models.CharField(
+                        max_length=100,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='Таблица',
+                    ),
+                ),
+                (
+                    'rows',
+                    models.BigIntegerField(
+                        default=0, verbose_name='Количество строк'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Счётчик строк',
+                'verbose_name_plural': 'Счётчики строк',
+            },
+        ),
+    ]
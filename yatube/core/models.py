@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Отложенная задача фоновой очереди.
+
+    Поле available_at одновременно задаёт время запуска (для
+    повторов с задержкой) и таймаут видимости: взявший задачу
+    воркер сдвигает его вперёд, и если воркер упадёт, задачу
+    после этого срока подхватит другой.
+    """
+
+    name = models.CharField(
+        verbose_name='Имя задачи',
+        max_length=200,
+    )
+    payload = models.TextField(
+        verbose_name='Аргументы в JSON',
+    )
+    priority = models.SmallIntegerField(
+        verbose_name='Приоритет',
+        default=0,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0,
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток',
+        default=3,
+    )
+    available_at = models.DateTimeField(
+        verbose_name='Доступна с',
+        default=timezone.now,
+    )
+    failed = models.BooleanField(
+        verbose_name='Завершилась ошибкой',
+        default=False,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = (
+            models.Index(
+                fields=('failed', '-priority', 'available_at'),
+                name='task_queue_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class RowCount(models.Model):
+    """Поддерживаемое сигналами число строк таблицы. Заменяет
+    COUNT(*) по большим таблицам на SQLite, где нет статистики
+    планировщика."""
+
+    table = models.CharField(
+        verbose_name='Таблица',
+        max_length=100,
+        primary_key=True,
+    )
+    rows = models.BigIntegerField(
+        verbose_name='Количество строк',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Счётчик строк'
+        verbose_name_plural = 'Счётчики строк'
+
+    def __str__(self):
+        return f'{self.table}: {self.rows}'
+
+
+class UserSession(models.Model):
+    """Сессия пользователя, записанная при входе. Позволяет
+    завершить сессии пользователя, не раскодируя все сессии."""
+
+    session_key = models.CharField(
+        verbose_name='Ключ сессии',
+        max_length=40,
+        primary_key=True,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='tracked_sessions',
+    )
+
+    class Meta:
+        verbose_name = 'Сессия пользователя'
+        verbose_name_plural = 'Сессии пользователей'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.session_key}'
@@ -0,0 +1,41 @@
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .counts import estimated_count
+
+ELLIPSIS = '…'
+
+
+def elided_page_range(page, on_each_side=3, on_ends=2):
+    """Номера страниц для навигации: первые и последние on_ends
+    страниц и окно вокруг текущей, пропуски заменены ELLIPSIS.
+
+    Генератор не строит полный page_range, поэтому размер
+    навигации не зависит от числа страниц.
+    """
+    number = page.number
+    num_pages = page.paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2:
+        yield from range(1, num_pages + 1)
+        return
+    if number > 1 + on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор для больших таблиц: вместо полного COUNT(*)
+    использует estimated_count."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
@@ -0,0 +1,80 @@
+import hashlib
+import re
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+PLACEHOLDER = '<!--personalized:{}-->'
+PLACEHOLDER_RE = re.compile(r'<!--personalized:([\w./-]+)-->')
+
+
+def defer_personalized(request):
+    """Помечает запрос: персональные фрагменты страницы
+    заменяются метками и подставляются после рендера."""
+    request.personalized_placeholders = True
+
+
+def is_deferred(request):
+    return getattr(request, 'personalized_placeholders', False)
+
+
+def fill_placeholders(request, content):
+    """Подставляет вместо меток фрагменты, отрисованные
+    для пользователя текущего запроса."""
+    return PLACEHOLDER_RE.sub(
+        lambda match: render_to_string(match.group(1), request=request),
+        content,
+    )
+
+
+def cache_shared_page(timeout, key_prefix=''):
+    """Кеширует страницу один раз для всех пользователей.
+
+    В отличие от cache_page, ключ не зависит от cookie: в кеш
+    попадает тело страницы с метками вместо шапки и других
+    персональных фрагментов, а сами фрагменты отрисовываются
+    для каждого запроса заново.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            url = request.build_absolute_uri()
+            key = 'shared_page.{}.{}'.format(
+                key_prefix, hashlib.md5(url.encode()).hexdigest()
+            )
+            cached = cache.get(key)
+            if cached is None:
+                defer_personalized(request)
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    if not response.streaming:
+                        response.content = fill_placeholders(
+                            request, response.content.decode(response.charset)
+                        )
+                    return response
+                # Cookie не кешируются: они персональные. Длина тела
+                # меняется после подстановки фрагментов.
+                headers = {
+                    header: value
+                    for header, value in response.items()
+                    if header.lower() != 'content-length'
+                }
+                cached = (response.content.decode(response.charset), headers)
+                cache.set(key, cached, timeout)
+            body, headers = cached
+            page = HttpResponse(
+                fill_placeholders(request, body),
+                content_type=headers.get('Content-Type'),
+            )
+            for header, value in headers.items():
+                page[header] = value
+            return page
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,141 @@
+import itertools
+import json
+import queue
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis необязателен
+    redis = None
+
+
+class Subscription:
+    """Подписка на каналы с ограниченной очередью событий.
+
+    Если клиент не успевает читать и очередь переполнилась,
+    подписка помечается overflowed: поток закрывается, а клиент
+    переподключается, не задерживая публикацию для остальных.
+    """
+
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.events = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Следующее событие или None по истечении timeout."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Pub/sub в пределах одного процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.counter = itertools.count(1)
+
+    def subscribe(self, channels, maxsize=None):
+        if maxsize is None:
+            maxsize = settings.SSE_QUEUE_SIZE
+        subscription = Subscription(self, channels, maxsize)
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscribers.get(channel, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self.subscribers.pop(channel, None)
+
+    def publish(self, channel, kind, data):
+        self.deliver(channel, kind, data)
+
+    def deliver(self, channel, kind, data):
+        event = (next(self.counter), kind, data)
+        with self.lock:
+            subscribers = tuple(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+class RedisBroker(LocalBroker):
+    """Pub/sub между процессами через Redis.
+
+    Публикация уходит в Redis, а фоновый поток каждого процесса
+    получает события и раздаёт их локальным подписчикам.
+    """
+
+    prefix = 'yatube:'
+
+    def __init__(self):
+        if redis is None:
+            raise ImproperlyConfigured(
+                'Для RedisBroker нужен пакет redis.'
+            )
+        super().__init__()
+        self.client = redis.Redis.from_url(settings.PUBSUB_REDIS_URL)
+        self.listener = threading.Thread(
+            target=self.listen, name='pubsub-listener', daemon=True
+        )
+        self.listener.start()
+
+    def publish(self, channel, kind, data):
+        self.client.publish(
+            self.prefix + channel, json.dumps({'kind': kind, 'data': data})
+        )
+
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + '*')
+        for message in pubsub.listen():
+            channel = message['channel'].decode()[len(self.prefix):]
+            payload = json.loads(message['data'])
+            self.deliver(channel, payload['kind'], payload['data'])
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Брокер процесса, класс задаётся настройкой PUBSUB_BACKEND."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.PUBSUB_BACKEND)()
+    return _broker
+
+
+@receiver(setting_changed)
+def reset_broker(setting, **kwargs):
+    global _broker
+    if setting == 'PUBSUB_BACKEND':
+        _broker = None
+
+
+def publish(channel, kind, data):
+    get_broker().publish(channel, kind, data)
@@ -0,0 +1,78 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .views import too_many_requests
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """Разбирает строку вида '10/m' в (ёмкость, период в секундах)."""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period]
+
+
+def client_ident(request):
+    """Ключ корзины: пользователь, если он вошёл, иначе IP-адрес."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return 'ip:{}'.format(request.META.get('REMOTE_ADDR', ''))
+
+
+def take_token(key, capacity, period):
+    """Учитывает запрос в счётчиках key и проверяет лимит.
+
+    Лимит считается скользящим окном: к счётчику текущего периода
+    добавляется счётчик предыдущего с весом, убывающим по мере
+    прохождения периода. Счётчики меняются атомарными add/incr,
+    поэтому параллельные запросы не делят один токен; лимит общий
+    для процессов, только если кеш общий (см. SHARED_CACHE).
+    Возвращает 0, если запрос разрешён, иначе — сколько секунд
+    ждать следующего.
+    """
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    current = f'{key}.{int(window)}'
+    cache.add(current, 0, period * 2)
+    count = cache.incr(current)
+    previous = cache.get(f'{key}.{int(window) - 1}', 0)
+    if previous * (1 - elapsed / period) + count <= capacity:
+        return 0
+    # Отклонённый запрос не расходует лимит.
+    cache.decr(current)
+    if previous:
+        wait = period * (1 - (capacity - count) / previous) - elapsed
+    else:
+        wait = period - elapsed
+    return max(1, math.ceil(min(wait, period - elapsed)))
+
+
+def ratelimit(scope, methods=('POST',)):
+    """Ограничивает частоту запросов к view скользящим окном.
+
+    Лимит берётся из settings.RATELIMITS[scope]. Если methods
+    равен None, учитываются запросы любым методом.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            rate = settings.RATELIMITS.get(scope)
+            if rate and (methods is None or request.method in methods):
+                capacity, period = parse_rate(rate)
+                retry_after = take_token(
+                    f'ratelimit.{scope}.{client_ident(request)}',
+                    capacity,
+                    period,
+                )
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,58 @@
+import random
+import threading
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+_state = threading.local()
+
+
+def pin_to_primary():
+    """Направляет все чтения текущего потока на основную базу."""
+    _state.pinned = True
+
+
+def reset():
+    _state.pinned = False
+    _state.wrote = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    """Была ли запись в основную базу с последнего reset()."""
+    return getattr(_state, 'wrote', False)
+
+
+class ReplicaRouter:
+    """Маршрутизатор: запись — в основную базу, чтение — в реплики.
+
+    После первой записи в запросе чтения до конца запроса идут
+    в основную базу; ReplicaPinningMiddleware продлевает это
+    на REPLICA_PIN_SECONDS для следующих запросов клиента, чтобы
+    он видел свои изменения, пока реплики догоняют.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if is_pinned() or not settings.DATABASE_REPLICAS:
+            return PRIMARY
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик приходит вместе с данными при репликации.
+        return db == PRIMARY
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.cache import cache
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import user_cache_key
+from .db.sqlite import configure_connection
+from .models import UserSession
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает закешированного пользователя при смене пароля,
+    профиля или last_login."""
+    cache.delete(user_cache_key(instance.pk))
+
+
+@receiver(user_logged_in)
+def remember_session(sender, request, user, **kwargs):
+    if request.session.session_key:
+        UserSession.objects.update_or_create(
+            session_key=request.session.session_key,
+            defaults={'user': user},
+        )
+
+
+@receiver(user_logged_out)
+def forget_session(sender, request, user, **kwargs):
+    if request.session.session_key:
+        UserSession.objects.filter(
+            session_key=request.session.session_key
+        ).delete()
+
+
+connection_created.connect(configure_connection)
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import StreamingHttpResponse
+
+from .pubsub import get_broker
+from .views import too_many_requests
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def connection_slots():
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.SSE_MAX_CONNECTIONS)
+    return _slots
+
+
+@receiver(setting_changed)
+def reset_slots(setting, **kwargs):
+    global _slots
+    if setting == 'SSE_MAX_CONNECTIONS':
+        _slots = None
+
+
+def format_event(event_id, kind, data):
+    return (
+        f'id: {event_id}\nevent: {kind}\n'
+        f'data: {json.dumps(data, ensure_ascii=False)}\n\n'
+    )
+
+
+class EventStream:
+    """Отдаёт события подписки в формате text/event-stream.
+
+    Пока событий нет, раз в SSE_HEARTBEAT секунд отправляется
+    комментарий, чтобы прокси не закрыли соединение. Поток
+    завершается через SSE_MAX_DURATION секунд или при
+    переполнении очереди; браузер переподключится сам.
+    Слот соединения освобождается в close(), которую Django
+    вызывает при закрытии ответа, даже если поток не читался.
+    """
+
+    def __init__(self, subscription, slots):
+        self.subscription = subscription
+        self.slots = slots
+        self.closed = False
+
+    def __iter__(self):
+        deadline = time.monotonic() + settings.SSE_MAX_DURATION
+        yield f'retry: {settings.SSE_RETRY_MS}\n\n'
+        while not self.subscription.overflowed:
+            timeout = min(settings.SSE_HEARTBEAT, deadline - time.monotonic())
+            if timeout <= 0:
+                break
+            event = self.subscription.get(timeout)
+            if event is None:
+                yield ': ping\n\n'
+            else:
+                yield format_event(*event)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.subscription.close()
+            self.slots.release()
+
+
+def sse_response(request, channels):
+    """Потоковый ответ с событиями каналов channels.
+
+    Каждое соединение занимает поток сервера, поэтому их число
+    ограничено SSE_MAX_CONNECTIONS; лишние получают 429.
+    """
+    slots = connection_slots()
+    if not slots.acquire(blocking=False):
+        return too_many_requests(request, settings.SSE_RETRY_MS // 1000)
+    subscription = get_broker().subscribe(channels)
+    response = StreamingHttpResponse(
+        EventStream(subscription, slots),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,75 @@
+import logging
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from .compression import INCOMPRESSIBLE_EXTENSIONS, compress, brotli
+
+logger = logging.getLogger(__name__)
+
+# Суффиксы предварительно сжатых вариантов статических файлов.
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище статики с хешированными именами файлов.
+
+    При collectstatic рядом с каждым файлом сохраняются
+    варианты .gz и .br, которые затем отдаёт
+    core.middleware.static.PrecompressedStaticMiddleware.
+    """
+
+    manifest_warned = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            if settings.DEBUG:
+                raise
+        # Без хешированного имени файл отдаётся с долгим кешем
+        # под исходным именем, поэтому ошибку нужно заметить.
+        if self.hashed_files:
+            logger.error('Файла статики %s нет в манифесте.', name)
+        elif not self.manifest_warned:
+            # Статика ещё не собрана (например, в тестах).
+            self.manifest_warned = True
+            logger.warning(
+                'Манифест статики не найден, выполните collectstatic.'
+            )
+        return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if not isinstance(processed, Exception):
+                processed_names.add(name)
+                if hashed_name:
+                    processed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+        # Сжимаем уже после всех проходов: файлы со ссылками
+        # (css) перезаписываются на каждом проходе.
+        for name in sorted(processed_names):
+            self.compress_file(name)
+
+    def compress_file(self, name):
+        """Сохраняет сжатые варианты файла, если они меньше исходного."""
+        if os.path.splitext(name)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+            return
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if encoding == 'br' and brotli is None:
+                continue
+            compressed = compress(data, encoding)
+            if len(compressed) >= len(data):
+                continue
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
@@ -0,0 +1,163 @@
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+from .routers import pin_to_primary
+
+logger = logging.getLogger(__name__)
+
+CLAIM_BATCH = 10
+REDACTED_PAYLOAD = ''
+
+registry = {}
+
+
+class TaskFunction:
+    """Обёртка функции, зарегистрированной как фоновая задача."""
+
+    def __init__(self, func, name, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Ставит задачу в очередь. Аргументы должны
+        сериализоваться в JSON."""
+        return self.schedule(args, kwargs)
+
+    def schedule(self, args=(), kwargs=None, priority=None, countdown=0):
+        return Task.objects.create(
+            name=self.name,
+            payload=json.dumps({'args': args, 'kwargs': kwargs or {}}),
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            available_at=timezone.now() + timedelta(seconds=countdown),
+        )
+
+
+def task(name=None, priority=0, max_attempts=3):
+    """Декоратор регистрации фоновой задачи.
+
+    Задачи с большим priority выполняются раньше.
+    """
+
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = TaskFunction(
+            func, task_name, priority, max_attempts
+        )
+        return registry[task_name]
+
+    return decorator
+
+
+def claim(visibility_timeout=None):
+    """Забирает самую приоритетную доступную задачу.
+
+    Задача считается занятой, когда условный UPDATE сдвинул её
+    available_at; это работает и между потоками, и между
+    процессами без SELECT ... FOR UPDATE, которого нет в SQLite.
+    """
+    if visibility_timeout is None:
+        visibility_timeout = settings.TASK_VISIBILITY_TIMEOUT
+    now = timezone.now()
+    candidates = (
+        Task.objects.filter(failed=False, available_at__lte=now)
+        .order_by('-priority', 'available_at', 'pk')
+        .values_list('pk', 'available_at')[:CLAIM_BATCH]
+    )
+    for pk, available_at in candidates:
+        claimed = Task.objects.filter(
+            pk=pk, available_at=available_at, failed=False
+        ).update(
+            available_at=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def run_task(task):
+    """Выполняет задачу. Успешная удаляется из очереди, упавшая
+    откладывается с экспоненциальной задержкой или, исчерпав
+    попытки, помечается failed без аргументов."""
+    try:
+        func = registry[task.name]
+        data = json.loads(task.payload)
+        func(*data['args'], **data['kwargs'])
+    except Exception as error:
+        logger.exception('Задача %s завершилась ошибкой', task)
+        changes = {'last_error': repr(error)}
+        if task.attempts >= task.max_attempts:
+            changes['failed'] = True
+            # Упавшие задачи хранятся бессрочно, а аргументы могут
+            # содержать личные данные, поэтому они не сохраняются.
+            changes['payload'] = REDACTED_PAYLOAD
+        else:
+            delay = settings.TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+            changes['available_at'] = timezone.now() + timedelta(
+                seconds=delay
+            )
+        Task.objects.filter(pk=task.pk).update(**changes)
+        return False
+    Task.objects.filter(pk=task.pk).delete()
+    return True
+
+
+def run_pending(limit=None):
+    """Выполняет доступные задачи в текущем потоке, пока очередь
+    не опустеет. Возвращает количество выполненных задач."""
+    # Задачи читают только что записанные данные: реплики
+    # могут отставать.
+    pin_to_primary()
+    processed = 0
+    while limit is None or processed < limit:
+        task = claim()
+        if task is None:
+            break
+        run_task(task)
+        processed += 1
+    return processed
+
+
+def worker_loop(stop, poll_interval):
+    pin_to_primary()
+    try:
+        while not stop.is_set():
+            task = claim()
+            if task is None:
+                stop.wait(poll_interval)
+            else:
+                run_task(task)
+    finally:
+        connection.close()
+
+
+def start_workers(count, poll_interval):
+    """Запускает count потоков-воркеров. Возвращает событие
+    остановки и список потоков."""
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=worker_loop,
+            args=(stop, poll_interval),
+            name=f'task-worker-{number}',
+            daemon=True,
+        )
+        for number in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    return stop, threads
@@ -0,0 +1,20 @@
+from django import template
+
+from ..paginator import elided_page_range as get_elided_page_range
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, number):
+    """Ссылка на страницу number с сохранением остальных
+    GET-параметров (поискового запроса, сортировки)."""
+    query = context['request'].GET.copy()
+    query['page'] = number
+    return f'?{query.urlencode()}'
+
+
+@register.simple_tag
+def elided_page_range(page):
+    """Сокращённый список номеров страниц для навигации."""
+    return get_elided_page_range(page)
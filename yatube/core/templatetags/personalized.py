@@ -0,0 +1,21 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..personalization import PLACEHOLDER, is_deferred
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def personalized(context, template_name):
+    """Подключает шаблон, зависящий от пользователя.
+
+    Если страница кешируется через cache_shared_page, вместо
+    шаблона выводится метка, которая заполняется после рендера.
+    """
+    request = context.get('request')
+    if request is not None and is_deferred(request):
+        return mark_safe(PLACEHOLDER.format(template_name))
+    return context.template.engine.get_template(template_name).render(
+        context
+    )
@@ -1,4 +1,64 @@
-from django.test import TestCase
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.contrib.auth.models import AnonymousUser
+from django.core.paginator import Paginator
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from .backends import CachedModelBackend
+from .compression import brotli
+from .counts import estimated_count, refresh_row_counts
+from .db.sqlite import retry_on_lock
+from .middleware.compression import CompressionMiddleware
+from .middleware.concurrency import WriteConcurrencyMiddleware, WriteSlots
+from .middleware.replicas import PIN_COOKIE, ReplicaPinningMiddleware
+from .models import RowCount, Task
+from .paginator import ELLIPSIS, elided_page_range
+from .personalization import cache_shared_page
+from .pubsub import LocalBroker, get_broker, publish
+from .ratelimit import ratelimit
+from .routers import ReplicaRouter, reset
+from .sse import sse_response
+from .tasks import REDACTED_PAYLOAD, claim, run_pending, task
+
+User = get_user_model()
+
+STATIC_SOURCE = tempfile.mkdtemp()
+STATIC_ROOT = tempfile.mkdtemp()
+CSS = b'body { color: red; }\n' * 200
+
+executed = []
+
+
+@task(name='core.tests.record')
+def record(value):
+    executed.append(value)
+
+
+@task(name='core.tests.broken', max_attempts=2)
+def broken():
+    raise ValueError('сбой')
 
 
 class ViewTestClass(TestCase):
@@ -6,3 +66,572 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, 404)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+@override_settings(
+    STATICFILES_DIRS=[STATIC_SOURCE],
+    STATIC_ROOT=STATIC_ROOT,
+)
+class PrecompressedStaticTests(TestCase):
+    """Тесты сборки и раздачи сжатой статики."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(os.path.join(STATIC_SOURCE, 'style.css'), 'wb') as css:
+            css.write(CSS)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.hashed_name = staticfiles_storage.stored_name('style.css')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_SOURCE, ignore_errors=True)
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_collectstatic_writes_compressed_variants(self):
+        """collectstatic сохраняет хешированный файл и его .gz."""
+        self.assertNotEqual(self.hashed_name, 'style.css')
+        path = os.path.join(STATIC_ROOT, self.hashed_name)
+        with open(path + '.gz', 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), CSS)
+
+    def test_missing_manifest_entry_is_logged(self):
+        """Файл не из манифеста отдаётся под исходным именем
+        с записью в лог, а при DEBUG вызывает ошибку."""
+        with self.assertLogs('core.storage', 'ERROR'):
+            self.assertEqual(
+                staticfiles_storage.stored_name('missing.css'), 'missing.css'
+            )
+        with override_settings(DEBUG=True):
+            with self.assertRaises(ValueError):
+                staticfiles_storage.stored_name('missing.css')
+
+    def test_serves_gzip_with_immutable_cache(self):
+        """Хешированный файл отдаётся сжатым и кешируется навсегда."""
+        response = self.client.get(
+            f'/static/{self.hashed_name}', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body), CSS)
+
+    def test_serves_plain_file_without_accept_encoding(self):
+        """Без Accept-Encoding отдаётся исходный файл."""
+        response = self.client.get('/static/style.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+
+    def test_etag_returns_not_modified(self):
+        """Повторный запрос с ETag получает 304."""
+        url = f'/static/{self.hashed_name}'
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Тесты сжатия ответов."""
+
+    def test_html_is_compressed_with_brotli(self):
+        """HTML-страница сжимается brotli, если клиент его принимает."""
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(b'<html', brotli.decompress(response.content))
+
+    def test_gzip_fallback(self):
+        """Без br в Accept-Encoding используется gzip."""
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'<html', gzip.decompress(response.content))
+
+    def test_short_response_is_not_compressed(self):
+        """Ответы короче порога не сжимаются."""
+        with self.settings(COMPRESSION_MIN_SIZE=10 ** 9):
+            response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_is_compressed(self):
+        """Потоковый ответ сжимается по мере генерации."""
+        chunks = [b'first chunk ' * 50, b'second chunk ' * 50]
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware().process_response(
+            request, StreamingHttpResponse(iter(chunks))
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body), b''.join(chunks))
+
+    def test_page_with_csrf_token_is_padded(self):
+        """К сжатой странице с токеном CSRF добавляется комментарий
+        случайной длины, к остальным страницам — нет."""
+        content = b'<html>' + b'x' * 1000 + b'</html>'
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware().process_response(
+            request, HttpResponse(content)
+        )
+        self.assertEqual(gzip.decompress(response.content), content)
+
+        request.META['CSRF_COOKIE_USED'] = True
+        response = CompressionMiddleware().process_response(
+            request, HttpResponse(content)
+        )
+        padded = gzip.decompress(response.content)
+        self.assertTrue(padded.startswith(content + b'<!-- '))
+        self.assertTrue(padded.endswith(b' -->'))
+        self.assertLessEqual(
+            len(padded) - len(content), settings.COMPRESSION_PADDING + 9
+        )
+
+    def test_event_stream_is_not_compressed(self):
+        """События не задерживаются в буфере компрессора."""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware().process_response(
+            request,
+            StreamingHttpResponse(
+                iter([b': ping\n\n']), content_type='text/event-stream'
+            ),
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class SharedPageCacheTests(TestCase):
+    """Тесты общего кеша страниц с персональными фрагментами."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_response_keeps_headers(self):
+        """Ответ из кеша сохраняет заголовки исходного ответа."""
+
+        def view(request):
+            response = HttpResponse(
+                'страница', content_type='text/plain; charset=utf-8'
+            )
+            response['Cache-Control'] = 'max-age=20'
+            response['Vary'] = 'Accept-Language'
+            return response
+
+        cached_view = cache_shared_page(20, key_prefix='test')(view)
+        cached_view(RequestFactory().get('/'))
+        response = cached_view(RequestFactory().get('/'))
+        self.assertEqual(response.content.decode(), 'страница')
+        self.assertEqual(
+            response['Content-Type'], 'text/plain; charset=utf-8'
+        )
+        self.assertEqual(response['Cache-Control'], 'max-age=20')
+        self.assertEqual(response['Vary'], 'Accept-Language')
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    USER_CACHE_TIMEOUT=60,
+)
+class CachedAuthenticationTests(TestCase):
+    """Тесты кеширования сессии и пользователя."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user')
+        self.client.force_login(self.user)
+
+    def test_authenticated_request_without_queries(self):
+        """Повторный запрос не обращается к сессиям и пользователям."""
+        self.client.get('/about/author/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/about/author/')
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_user_cache_invalidated_on_save(self):
+        """Изменение пользователя сбрасывает кеш."""
+        backend = CachedModelBackend()
+        backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            backend.get_user(self.user.pk)
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        self.assertEqual(
+            backend.get_user(self.user.pk).first_name, 'Новое имя'
+        )
+
+    @override_settings(USER_CACHE_TIMEOUT=0)
+    def test_user_not_cached_without_timeout(self):
+        backend = CachedModelBackend()
+        backend.get_user(self.user.pk)
+        with self.assertNumQueries(1):
+            backend.get_user(self.user.pk)
+
+
+@override_settings(RATELIMITS={'test': '2/m'})
+class RateLimitTests(TestCase):
+    """Тесты ограничения частоты запросов."""
+
+    def setUp(self):
+        cache.clear()
+        self.view = ratelimit('test')(lambda request: HttpResponse('ok'))
+
+    def make_request(self, method='post', ip='10.0.0.1'):
+        request = getattr(RequestFactory(), method)('/', REMOTE_ADDR=ip)
+        request.user = AnonymousUser()
+        return request
+
+    def test_bucket_exhausted_returns_429(self):
+        """После исчерпания корзины возвращается 429 с Retry-After."""
+        for _ in range(2):
+            self.assertEqual(self.view(self.make_request()).status_code, 200)
+        response = self.view(self.make_request())
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_buckets_are_separate_per_ip(self):
+        """У каждого IP-адреса своя корзина."""
+        for _ in range(3):
+            self.view(self.make_request())
+        response = self.view(self.make_request(ip='10.0.0.2'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_parallel_requests_share_the_limit(self):
+        """Параллельные запросы не получают один и тот же токен."""
+        statuses = []
+        threads = [
+            threading.Thread(
+                target=lambda: statuses.append(
+                    self.view(self.make_request()).status_code
+                )
+            )
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(statuses.count(200), 2)
+
+    def test_safe_methods_are_not_limited(self):
+        """GET-запросы не расходуют токены."""
+        for _ in range(3):
+            response = self.view(self.make_request(method='get'))
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(TestCase):
+    """Тесты маршрутизации чтения в реплики."""
+
+    def setUp(self):
+        reset()
+        self.addCleanup(reset)
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_replica_until_write(self):
+        """После записи чтения в том же запросе идут в основную базу."""
+        self.assertEqual(self.router.db_for_read(User), 'replica1')
+        self.assertEqual(self.router.db_for_write(User), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_write_sets_pin_cookie(self):
+        """После записи клиент получает cookie привязки к основной базе."""
+
+        def view(request):
+            self.router.db_for_write(User)
+            return HttpResponse()
+
+        request = RequestFactory().post('/')
+        response = ReplicaPinningMiddleware(view)(request)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_routes_reads_to_primary(self):
+        """С cookie привязки чтения идут в основную базу."""
+
+        def view(request):
+            return HttpResponse(self.router.db_for_read(User))
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        response = ReplicaPinningMiddleware(view)(request)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+
+@override_settings(
+    WRITE_LOCK_DIR=tempfile.mkdtemp(),
+    WRITE_CONCURRENCY_LIMIT=1,
+    WRITE_QUEUE_TIMEOUT=0,
+)
+class WriteConcurrencyTests(TestCase):
+    """Тесты ограничения одновременных запросов на запись."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.WRITE_LOCK_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_busy_slots_are_shared_between_instances(self):
+        """Слот, занятый другим процессом, не даёт начать запись."""
+        middleware = WriteConcurrencyMiddleware(lambda r: HttpResponse())
+        other = WriteSlots(settings.WRITE_LOCK_DIR, 1)
+        fd = other.acquire(0)
+        request = RequestFactory().post('/')
+        self.assertEqual(middleware(request).status_code, 429)
+        self.assertEqual(
+            middleware(RequestFactory().get('/')).status_code, 200
+        )
+        other.release(fd)
+        self.assertEqual(middleware(request).status_code, 200)
+
+
+class SQLiteTests(TransactionTestCase):
+    """Тесты настройки SQLite для конкурентной записи."""
+
+    def test_pragmas_applied_to_connection(self):
+        """Соединение получает busy_timeout из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    def test_retry_on_lock(self):
+        """View повторяется при ошибке блокировки вне транзакции."""
+        calls = []
+
+        def view():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        self.assertEqual(retry_on_lock(delay=0)(view)(), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_retry_does_not_duplicate_writes(self):
+        """Записи неудачной попытки откатываются вместе с ней."""
+        calls = []
+
+        def view():
+            calls.append(1)
+            User.objects.create_user(username=f'user{len(calls)}')
+            if len(calls) < 2:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        self.assertEqual(retry_on_lock(delay=0)(view)(), 'ok')
+        self.assertEqual(
+            list(User.objects.values_list('username', flat=True)), ['user2']
+        )
+
+    def test_other_errors_are_not_retried(self):
+        def view():
+            raise OperationalError('no such table')
+
+        with self.assertRaises(OperationalError):
+            retry_on_lock(delay=0)(view)()
+
+
+class TaskQueueTests(TestCase):
+    """Тесты фоновой очереди задач."""
+
+    def setUp(self):
+        executed.clear()
+
+    def test_tasks_run_by_priority(self):
+        """Задачи с большим приоритетом выполняются первыми."""
+        record.delay('обычная')
+        record.schedule(('срочная',), priority=5)
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(executed, ['срочная', 'обычная'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_then_marked(self):
+        """Упавшая задача откладывается, а после исчерпания
+        попыток помечается failed."""
+        broken.delay()
+        run_pending()
+        queued = Task.objects.get()
+        self.assertEqual(queued.attempts, 1)
+        self.assertFalse(queued.failed)
+        self.assertGreater(queued.available_at, timezone.now())
+        Task.objects.update(available_at=timezone.now())
+        run_pending()
+        queued.refresh_from_db()
+        self.assertTrue(queued.failed)
+        self.assertIn('сбой', queued.last_error)
+        self.assertEqual(queued.payload, REDACTED_PAYLOAD)
+
+    def test_claimed_task_hidden_until_timeout(self):
+        """Взятая задача невидима другим воркерам до истечения
+        таймаута видимости."""
+        record.delay('x')
+        self.assertIsNotNone(claim())
+        self.assertIsNone(claim())
+        Task.objects.update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertIsNotNone(claim())
+
+    def test_password_reset_email_is_queued(self):
+        """Письмо сброса пароля отправляет воркер, а не запрос."""
+        User.objects.create_user(
+            username='forgot', email='forgot@ya.ru', password='secret-42'
+        )
+        self.client.post(
+            reverse('users:password_reset'), {'email': 'forgot@ya.ru'}
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertNotIn('/reset/', Task.objects.get().payload)
+        call_command('run_tasks', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['forgot@ya.ru'])
+        link = re.search(r'/auth/reset/\S+', mail.outbox[0].body).group()
+        response = self.client.get(link, follow=True)
+        self.assertTrue(response.context['validlink'])
+
+
+class PubSubTests(TestCase):
+    """Тесты pub/sub и потока Server-Sent Events."""
+
+    def test_events_delivered_to_channel_subscribers(self):
+        broker = LocalBroker()
+        subscription = broker.subscribe(('a',))
+        other = broker.subscribe(('b',))
+        broker.publish('a', 'post', {'id': 1})
+        self.assertEqual(subscription.get(0), (1, 'post', {'id': 1}))
+        self.assertIsNone(other.get(0))
+        subscription.close()
+        self.assertNotIn('a', broker.subscribers)
+
+    def test_slow_subscriber_overflows(self):
+        """Переполненная очередь не блокирует публикацию."""
+        broker = LocalBroker()
+        subscription = broker.subscribe(('a',), maxsize=1)
+        broker.publish('a', 'post', {})
+        broker.publish('a', 'post', {})
+        self.assertTrue(subscription.overflowed)
+
+    @override_settings(SSE_HEARTBEAT=0.05, SSE_MAX_DURATION=0.2)
+    def test_stream_sends_events_and_heartbeat(self):
+        response = sse_response(RequestFactory().get('/'), ('feed',))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        publish('feed', 'post', {'id': 7})
+        body = ''.join(
+            chunk.decode() for chunk in response.streaming_content
+        )
+        response.close()
+        self.assertIn('event: post\ndata: {"id": 7}', body)
+        self.assertIn(': ping', body)
+        self.assertNotIn('feed', get_broker().subscribers)
+
+    @override_settings(SSE_MAX_CONNECTIONS=1)
+    def test_connection_limit(self):
+        """Соединения сверх SSE_MAX_CONNECTIONS получают 429,
+        закрытие потока освобождает слот."""
+        request = RequestFactory().get('/')
+        first = sse_response(request, ('feed',))
+        self.assertEqual(sse_response(request, ('feed',)).status_code, 429)
+        first.close()
+        second = sse_response(request, ('feed',))
+        self.assertEqual(second.status_code, 200)
+        second.close()
+
+
+class EstimatedCountTests(TestCase):
+    """Тесты оценочного подсчёта строк."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_small_querysets_counted_exactly(self):
+        """До порога число строк считается точно."""
+        for name in ('a', 'b', 'c'):
+            User.objects.create_user(username=name)
+        with self.assertNumQueries(1):
+            self.assertEqual(estimated_count(User.objects.all(), 5), 3)
+
+    def test_whole_table_uses_row_counter(self):
+        """Для всей таблицы число берётся из счётчика, который
+        обновляют сигналы."""
+        from posts.models import Post
+
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='1')
+        refresh_row_counts()
+        Post.objects.create(author=author, text='2')
+        table = Post._meta.db_table
+        self.assertEqual(RowCount.objects.get(table=table).rows, 2)
+        RowCount.objects.filter(table=table).update(rows=1000)
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                estimated_count(Post.all_objects.all(), 1), 1000
+            )
+
+    def test_hidden_rows_are_not_counted_below_threshold(self):
+        """Скрытые посты не попадают в точное число видимых."""
+        from posts.models import Post
+
+        author = User.objects.create_user(username='author')
+        for number in range(10):
+            Post.objects.create(author=author, text=str(number))
+        Post.all_objects.filter(
+            pk__in=Post.all_objects.order_by('pk')[:8].values('pk')
+        ).update(is_deleted=True)
+        self.assertEqual(estimated_count(Post.objects.all(), 5), 2)
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=1)
+    def test_index_feed_uses_row_counter(self):
+        """Главная лента берёт число постов из счётчика,
+        а не из COUNT(*)."""
+        from posts.models import Post
+
+        author = User.objects.create_user(username='author')
+        for number in range(3):
+            Post.objects.create(author=author, text=str(number))
+        RowCount.objects.update_or_create(
+            table=Post._meta.db_table, defaults={'rows': 1000}
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 1000)
+
+    def test_follow_and_unfollow_keep_counter(self):
+        """Подписка и отписка через views меняют счётчик парно."""
+        from posts.models import Follow
+
+        User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        refresh_row_counts()
+        self.client.force_login(reader)
+        self.client.get(reverse('posts:profile_follow', args=('author',)))
+        table = Follow._meta.db_table
+        self.assertEqual(RowCount.objects.get(table=table).rows, 1)
+        self.client.get(reverse('posts:profile_unfollow', args=('author',)))
+        self.assertEqual(RowCount.objects.get(table=table).rows, 0)
+
+    def test_filtered_count_is_cached(self):
+        for name in ('a', 'b', 'c'):
+            User.objects.create_user(username=name)
+        users = User.objects.filter(username__in=('a', 'b', 'c'))
+        self.assertEqual(estimated_count(users, 1), 3)
+        User.objects.filter(username='c').delete()
+        self.assertEqual(estimated_count(users, 1), 3)
+
+
+class ElidedPageRangeTests(TestCase):
+    def test_range_is_elided_around_current_page(self):
+        """Выводятся края и окно вокруг текущей страницы."""
+        page = Paginator(range(100000), 1).page(50000)
+        self.assertEqual(
+            list(elided_page_range(page)),
+            [1, 2, ELLIPSIS, 49997, 49998, 49999, 50000]
+            + [50001, 50002, 50003, ELLIPSIS, 99999, 100000],
+        )
+
+    def test_short_range_is_not_elided(self):
+        page = Paginator(range(5), 1).page(1)
+        self.assertEqual(list(elided_page_range(page)), [1, 2, 3, 4, 5])
@@ -0,0 +1,53 @@
+import io
+import time
+import zipfile
+
+
+class StreamSink(io.RawIOBase):
+    """Несмещаемый файл, копящий записанные байты до выдачи.
+
+    ZipFile не может вызвать seek() у такого файла и поэтому
+    пишет размеры и CRC после данных записи (data descriptor).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def zip_entry(name, compress_type=zipfile.ZIP_DEFLATED):
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = compress_type
+    return info
+
+
+def zip_stream(entries):
+    """Генератор байтов zip-архива из пар (ZipInfo, итератор байтов).
+
+    В памяти держится только текущая порция данных, поэтому размер
+    архива не ограничен; force_zip64 нужен, так как размеры записей
+    заранее неизвестны.
+    """
+    sink = StreamSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for info, chunks in entries:
+            with archive.open(info, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
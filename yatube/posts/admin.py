@@ -1,21 +1,102 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import Group, Post, Comment, Follow
+from core.paginator import EstimatedCountPaginator
 
+from .deletion import schedule_deletion
+from .models import Group, Post, Comment, Follow, User
+from .utils import search_posts
 
-class PostAdmin(admin.ModelAdmin):
+
+def schedule_for_deletion(modeladmin, request, queryset):
+    """Скрывает выбранные объекты; сами строки удаляет
+    команда purge_deleted небольшими порциями."""
+    for obj in queryset:
+        schedule_deletion(obj)
+
+
+schedule_for_deletion.short_description = 'Удалить в фоне'
+schedule_for_deletion.allowed_permissions = ('schedule_deletion',)
+
+
+class ScheduledDeletionMixin:
+    """Удаление только через очередь purge_deleted.
+
+    Обычное удаление админки каскадом удаляет все связанные
+    строки в одной транзакции и надолго блокирует базу, поэтому
+    оно и delete_selected отключены.
+    """
+
+    actions = (schedule_for_deletion,)
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def has_schedule_deletion_permission(self, request):
+        return super().has_delete_permission(request)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Базовая настройка списков для таблиц с миллионами строк:
+    оценочный подсчёт вместо COUNT(*) по всей таблице и виджеты
+    поиска вместо выпадающих списков со всеми пользователями."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class PostAdmin(ScheduledDeletionMixin, LargeTableAdmin):
     """Класс PostAdmin используется для задания конфигурации
     модели Post.
     """
 
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
-    list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
+    # DateFieldListFilter даёт фиксированные периоды без запросов;
+    # date_hierarchy делал SELECT DISTINCT по годам всей таблицы.
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # На PostgreSQL — полнотекстовый поиск по GIN-индексу
+        # вместо LIKE '%...%' по всей таблице.
+        if not search_term:
+            return queryset, False
+        return (
+            queryset.filter(pk__in=search_posts(search_term).values('pk')),
+            False,
+        )
+
+
+class GroupAdmin(ScheduledDeletionMixin, admin.ModelAdmin):
+    search_fields = ('title', 'slug')
+
+
+class UserAdmin(ScheduledDeletionMixin, BaseUserAdmin):
+    pass
+
+
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    search_fields = ('=author__username',)
+    list_filter = ('created',)
+
+
+class FollowAdmin(LargeTableAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    search_fields = ('=user__username', '=author__username')
+
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
@@ -1,3 +1,27 @@
+import datetime
+
+from django.utils import timezone
+
 PAGIN_PAGES = 10
+# Порядок лент и поле курсора бесконечной прокрутки.
+FEED_CURSOR_FIELD = 'pub_date'
+FEED_ORDERING = ('-pub_date', '-pk')
 POST_STRING_SIZE = 30
 POSTS_FOR_TESTING = 3
+RECOMMENDATIONS_COUNT = 5
+HOT_EPOCH = datetime.datetime(2022, 1, 1, tzinfo=timezone.utc)
+HOT_HALF_LIFE = 60 * 60 * 12
+HOT_COMMENT_WEIGHT = 1
+SEARCH_CONFIG = 'russian'
+DIGEST_BATCH_SIZE = 500
+DIGEST_MAX_POSTS = 10
+DIGEST_LOOKBACK = datetime.timedelta(days=1)
+DIGEST_MAX_AGE = datetime.timedelta(days=7)
+DIGEST_FRAGMENT_TIMEOUT = 60 * 60 * 24
+# Должны совпадать с тегом thumbnail в шаблонах постов.
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+UNREAD_TIMEOUT = 60 * 10
+UNREAD_LOCAL_TIMEOUT = 60
+MENTIONS_PER_POST = 10
+TAKEOUT_CHUNK_SIZE = 500
@@ -0,0 +1,177 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from sorl.thumbnail import delete as delete_image
+
+from core.backends import user_cache_key
+from core.models import UserSession
+
+from . import group_stats
+from .notifications import forget_unread, unread_recipients
+from .models import (
+    Comment,
+    DeletionRequest,
+    Follow,
+    Group,
+    GroupStats,
+    Notification,
+    Post,
+    Recommendation,
+    User,
+)
+
+
+def schedule_deletion(obj):
+    """Скрывает объект сразу и ставит его в очередь удаления.
+
+    Выполняется несколькими короткими запросами вместо каскадного
+    удаления всех связанных строк в одной транзакции.
+    """
+    with transaction.atomic():
+        if isinstance(obj, User):
+            kind = DeletionRequest.USER
+            User.objects.filter(pk=obj.pk).update(is_active=False)
+        elif isinstance(obj, Group):
+            kind = DeletionRequest.GROUP
+            Group.all_objects.filter(pk=obj.pk).update(is_deleted=True)
+        elif isinstance(obj, Post):
+            kind = DeletionRequest.POST
+            hidden = Post.all_objects.filter(
+                pk=obj.pk, is_deleted=False
+            ).update(is_deleted=True)
+            if hidden and obj.group_id is not None:
+                group_stats.post_removed(obj, obj.group_id)
+        else:
+            raise TypeError(f'Фоновое удаление не поддерживается: {obj!r}')
+        DeletionRequest.objects.get_or_create(kind=kind, object_id=obj.pk)
+    if kind == DeletionRequest.USER:
+        # Неактивного пользователя бэкенд не пускает, поэтому сброс
+        # кеша сразу завершает его сессии; сами строки сессий
+        # удаляет purge_user.
+        cache.delete(user_cache_key(obj.pk))
+        # Уведомления от удаляемого пользователя больше не видны.
+        forget_unread(
+            unread_recipients(Notification.objects.filter(actor_id=obj.pk))
+        )
+
+
+def delete_chunk(queryset, chunk_size):
+    """Удаляет не больше chunk_size строк queryset в отдельной
+    транзакции. Возвращает True, если что-то было удалено."""
+    ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+    if not ids:
+        return False
+    with transaction.atomic():
+        queryset.model._base_manager.filter(pk__in=ids).delete()
+    return True
+
+
+def delete_posts_chunk(posts, chunk_size):
+    """Удаляет порцию постов: сначала порциями их комментарии
+    и уведомления, затем файлы изображений с миниатюрами
+    и сами посты."""
+    post_ids = list(posts.values_list('pk', flat=True)[:chunk_size])
+    if not post_ids:
+        return False
+    comments = Comment.all_objects.filter(post_id__in=post_ids)
+    while delete_chunk(comments, chunk_size):
+        pass
+    notifications = Notification.objects.filter(post_id__in=post_ids)
+    recipients = unread_recipients(notifications)
+    while delete_chunk(notifications, chunk_size):
+        pass
+    forget_unread(recipients)
+    chunk = Post.all_objects.filter(pk__in=post_ids)
+    for post in chunk.exclude(image='').exclude(image=None):
+        delete_image(post.image, delete_file=True)
+    with transaction.atomic():
+        chunk.delete()
+    return True
+
+
+def purge_post(post_id, chunk_size):
+    comments = Comment.all_objects.filter(post_id=post_id)
+    while delete_chunk(comments, chunk_size):
+        pass
+    delete_posts_chunk(Post.all_objects.filter(pk=post_id), chunk_size)
+
+
+def purge_group(group_id, chunk_size):
+    # Посты группы не удаляются, а открепляются (SET_NULL)
+    # порциями, как при каскаде.
+    while True:
+        ids = list(
+            Post.all_objects.filter(group_id=group_id).values_list(
+                'pk', flat=True
+            )[:chunk_size]
+        )
+        if not ids:
+            break
+        Post.all_objects.filter(pk__in=ids).update(group=None)
+    GroupStats.objects.filter(pk=group_id).delete()
+    Group.all_objects.filter(pk=group_id).delete()
+
+
+def delete_user_sessions(user_id):
+    """Удаляет сессии пользователя, записанные при входе.
+
+    Сессии, открытые до появления UserSession, не находятся,
+    но бэкенд не пускает удаляемого (неактивного) пользователя,
+    а строки удалит clearsessions после истечения срока.
+    """
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    keys = UserSession.objects.filter(user_id=user_id).values_list(
+        'session_key', flat=True
+    )
+    for session_key in keys:
+        # Через SessionStore, чтобы сессия ушла и из кеша.
+        store(session_key).delete()
+    UserSession.objects.filter(user_id=user_id).delete()
+
+
+def purge_user(user_id, chunk_size):
+    delete_user_sessions(user_id)
+    related = (
+        Comment.all_objects.filter(author_id=user_id),
+        Follow.objects.filter(user_id=user_id),
+        Follow.objects.filter(author_id=user_id),
+        Recommendation.objects.filter(user_id=user_id),
+        Recommendation.objects.filter(author_id=user_id),
+        Notification.objects.filter(recipient_id=user_id),
+        Notification.objects.filter(actor_id=user_id),
+    )
+    for queryset in related:
+        while delete_chunk(queryset, chunk_size):
+            pass
+    while delete_posts_chunk(
+        Post.all_objects.filter(author_id=user_id), chunk_size
+    ):
+        pass
+    User.objects.filter(pk=user_id).delete()
+
+
+PURGERS = {
+    DeletionRequest.USER: purge_user,
+    DeletionRequest.GROUP: purge_group,
+    DeletionRequest.POST: purge_post,
+}
+
+
+def process_deletions(chunk_size, limit=None):
+    """Выполняет запросы на удаление из очереди.
+
+    Каждая транзакция затрагивает не больше chunk_size строк,
+    поэтому блокировка базы держится недолго. Возвращает
+    количество обработанных запросов.
+    """
+    requests = DeletionRequest.objects.all()
+    if limit is not None:
+        requests = requests[:limit]
+    processed = 0
+    for request in requests:
+        PURGERS[request.kind](request.object_id, chunk_size)
+        request.delete()
+        processed += 1
+    return processed
@@ -0,0 +1,241 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection
+from django.db.models import Count, Exists, F, OuterRef, Window
+from django.db.models.functions import RowNumber
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.tasks import task
+
+from .constants import (
+    DIGEST_BATCH_SIZE,
+    DIGEST_FRAGMENT_TIMEOUT,
+    DIGEST_LOOKBACK,
+    DIGEST_MAX_AGE,
+    DIGEST_MAX_POSTS,
+)
+from .models import Digest, Follow, Post, User
+
+FRAGMENT_KEY = 'digest_post:{}'
+
+
+def subscriber_batches(batch_size=DIGEST_BATCH_SIZE):
+    """Отдаёт id пользователей с подписками порциями.
+
+    Порции выбираются по первичному ключу (keyset), поэтому
+    каждая стоит одного запроса по индексу независимо от того,
+    сколько пользователей уже обработано.
+    """
+    subscribers = (
+        User.objects.filter(is_active=True)
+        .exclude(email='')
+        .annotate(
+            has_follows=Exists(Follow.objects.filter(user=OuterRef('pk')))
+        )
+        .filter(has_follows=True)
+        .order_by('pk')
+    )
+    last_pk = 0
+    while True:
+        ids = list(
+            subscribers.filter(pk__gt=last_pk).values_list('pk', flat=True)[
+                :batch_size
+            ]
+        )
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def render_fragments(posts):
+    """Возвращает текст каждого поста для письма. Фрагменты
+    общие для всех получателей и берутся из кеша одним запросом."""
+    keys = {post.pk: FRAGMENT_KEY.format(post.pk) for post in posts}
+    fragments = cache.get_many(keys.values())
+    missing = {}
+    for post in posts:
+        if keys[post.pk] not in fragments:
+            missing[keys[post.pk]] = render_to_string(
+                'posts/email/digest_post.txt',
+                {'post': post, 'site_url': settings.SITE_URL},
+            )
+    cache.set_many(missing, DIGEST_FRAGMENT_TIMEOUT)
+    fragments.update(missing)
+    return {pk: fragments[key] for pk, key in keys.items()}
+
+
+def invalidate_fragment(post_id):
+    cache.delete(FRAGMENT_KEY.format(post_id))
+
+
+def recent_posts(author_ids, since, now, limit=DIGEST_MAX_POSTS):
+    """Новые посты авторов, не больше limit самых свежих на автора.
+
+    Ранг считается оконной функцией, поэтому в память попадает
+    не больше limit строк на автора, сколько бы он ни написал.
+    Возвращает посты и число всех новых постов каждого автора.
+    """
+    ranked = (
+        Post.objects.filter(
+            author_id__in=author_ids, pub_date__gt=since, pub_date__lte=now
+        )
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=[F('author_id')],
+                order_by=F('pub_date').desc(),
+            ),
+            total=Window(Count('pk'), partition_by=[F('author_id')]),
+        )
+        .values('pk', 'author_id', 'rank', 'total')
+    )
+    sql, params = ranked.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT id, author_id, total FROM ({sql}) ranked '
+            'WHERE rank <= %s',
+            (*params, limit),
+        )
+        rows = cursor.fetchall()
+    totals = {author_id: total for _, author_id, total in rows}
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        [pk for pk, _, _ in rows]
+    )
+    return list(posts.values()), totals
+
+
+def count_new_posts(posts, since, total, window_start, limit):
+    """Сколько новых постов автора у получателя и точно ли это
+    число. posts — загруженные (не больше limit) посты автора."""
+    if since == window_start:
+        return total, True
+    fresh = sum(post.pub_date > since for post in posts)
+    # Точно, если загружены все посты автора или отсечка по дате
+    # попала внутрь загруженных.
+    return fresh, total <= limit or fresh < len(posts)
+
+
+def send_digests_to(user_ids, now):
+    """Рассылает дайджест порции пользователей.
+
+    На порцию уходит фиксированное число запросов: пользователи,
+    даты прошлых рассылок, подписки, новые посты (не больше
+    DIGEST_MAX_POSTS на автора), фрагменты из кеша и два запроса
+    на сохранение дат. Письма отправляются одним соединением.
+    Возвращает количество отправленных писем.
+    """
+    users = User.objects.in_bulk(user_ids)
+    last_sent = dict(
+        Digest.objects.filter(user_id__in=user_ids).values_list(
+            'user_id', 'last_sent_at'
+        )
+    )
+    since = {
+        pk: max(last_sent.get(pk, now - DIGEST_LOOKBACK), now - DIGEST_MAX_AGE)
+        for pk in users
+    }
+    authors = defaultdict(list)
+    for user_id, author_id in Follow.objects.filter(
+        user_id__in=user_ids
+    ).values_list('user_id', 'author_id'):
+        authors[user_id].append(author_id)
+
+    posts_by_author = defaultdict(list)
+    totals = {}
+    window_start = min(since.values(), default=now)
+    if since:
+        posts, totals = recent_posts(
+            {pk for ids in authors.values() for pk in ids}, window_start, now
+        )
+        for post in posts:
+            posts_by_author[post.author_id].append(post)
+
+    digests = []
+    for pk, user in users.items():
+        new_posts = []
+        count = 0
+        exact = True
+        for author_id in authors[pk]:
+            author_posts = posts_by_author[author_id]
+            if not author_posts:
+                continue
+            new_posts.extend(
+                post for post in author_posts if post.pub_date > since[pk]
+            )
+            author_count, author_exact = count_new_posts(
+                author_posts,
+                since[pk],
+                totals[author_id],
+                window_start,
+                DIGEST_MAX_POSTS,
+            )
+            count += author_count
+            exact = exact and author_exact
+        if not new_posts:
+            continue
+        new_posts.sort(key=lambda post: post.pub_date, reverse=True)
+        shown = new_posts[:DIGEST_MAX_POSTS]
+        digests.append((user, shown, count - len(shown), not exact))
+
+    # Фрагменты всех писем порции берутся из кеша одним запросом.
+    batch_posts = {
+        post.pk: post for _, shown, _, _ in digests for post in shown
+    }
+    fragments = render_fragments(list(batch_posts.values()))
+    messages = []
+    for user, shown, more, truncated in digests:
+        body = render_to_string(
+            'posts/email/digest.txt',
+            {
+                'user': user,
+                'fragments': [fragments[post.pk] for post in shown],
+                'more': more,
+                'truncated': truncated,
+                'site_url': settings.SITE_URL,
+            },
+        )
+        messages.append(
+            EmailMessage(
+                'Новые посты ваших авторов',
+                body,
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+            )
+        )
+    if messages:
+        get_connection().send_messages(messages)
+
+    Digest.objects.bulk_create(
+        (
+            Digest(user_id=pk, last_sent_at=now)
+            for pk in users
+            if pk not in last_sent
+        ),
+        ignore_conflicts=True,
+    )
+    Digest.objects.filter(user_id__in=last_sent).update(last_sent_at=now)
+    return len(messages)
+
+
+@task()
+def send_digest_batch(user_ids, now):
+    send_digests_to(user_ids, parse_datetime(now))
+
+
+def send_digests(batch_size=DIGEST_BATCH_SIZE, queue=False):
+    """Рассылает дайджест всем подписчикам. С queue=True порции
+    ставятся в фоновую очередь и делятся между воркерами."""
+    now = timezone.now()
+    sent = 0
+    for user_ids in subscriber_batches(batch_size):
+        if queue:
+            send_digest_batch.delay(user_ids, now.isoformat())
+        else:
+            sent += send_digests_to(user_ids, now)
+    return sent
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.urls import reverse
+
+from core.pubsub import publish
+
+POSTS_CHANNEL = 'posts'
+
+
+def author_channel(author_id):
+    return f'author.{author_id}'
+
+
+def post_channel(post_id):
+    return f'post.{post_id}'
+
+
+def publish_post(post):
+    """Публикует событие о новом посте после фиксации транзакции,
+    чтобы клиент, перезагрузив страницу, увидел запись."""
+    data = {
+        'id': post.pk,
+        'author': post.author.username,
+        'url': reverse('posts:post_detail', args=(post.pk,)),
+    }
+
+    def send():
+        publish(POSTS_CHANNEL, 'post', data)
+        publish(author_channel(post.author_id), 'post', data)
+
+    transaction.on_commit(send)
+
+
+def publish_comment(comment):
+    data = {
+        'id': comment.pk,
+        'post': comment.post_id,
+        'author': comment.author.username,
+    }
+    transaction.on_commit(
+        lambda: publish(post_channel(comment.post_id), 'comment', data)
+    )
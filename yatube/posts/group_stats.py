@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+
+from .models import Group, GroupStats, Post
+
+
+def rebuild_all():
+    """Пересчитывает статистику всех групп одним агрегирующим запросом."""
+    visible = Q(posts__is_deleted=False)
+    groups = Group.all_objects.annotate(
+        total_posts=Count('posts', filter=visible),
+        total_authors=Count('posts__author', distinct=True, filter=visible),
+        last_post=Max('posts__pub_date', filter=visible),
+    ).values_list('pk', 'total_posts', 'total_authors', 'last_post')
+    with transaction.atomic():
+        GroupStats.objects.all().delete()
+        GroupStats.objects.bulk_create(
+            GroupStats(
+                group_id=group_id,
+                post_count=post_count,
+                author_count=author_count,
+                last_post_at=last_post_at,
+            )
+            for group_id, post_count, author_count, last_post_at in groups
+        )
+
+
+def visible_posts(group_id):
+    # Скрытые посты уже вычтены из статистики при пометке.
+    return Post.all_objects.filter(group_id=group_id, is_deleted=False)
+
+
+def has_other_posts(group_id, author_id, post_id):
+    return (
+        visible_posts(group_id)
+        .filter(author_id=author_id)
+        .exclude(pk=post_id)
+        .exists()
+    )
+
+
+def post_added(post, group_id):
+    """Учитывает пост, появившийся в группе group_id."""
+    stats, _ = GroupStats.objects.get_or_create(group_id=group_id)
+    new_author = not has_other_posts(group_id, post.author_id, post.pk)
+    changes = {
+        'post_count': F('post_count') + 1,
+        'author_count': F('author_count') + int(new_author),
+    }
+    if stats.last_post_at is None or post.pub_date > stats.last_post_at:
+        changes['last_post_at'] = post.pub_date
+    GroupStats.objects.filter(pk=group_id).update(**changes)
+
+
+def post_removed(post, group_id):
+    """Учитывает пост, удалённый из группы group_id."""
+    stats = GroupStats.objects.filter(pk=group_id).first()
+    if stats is None:
+        return
+    gone_author = not has_other_posts(group_id, post.author_id, post.pk)
+    changes = {
+        'post_count': F('post_count') - 1,
+        'author_count': F('author_count') - int(gone_author),
+    }
+    if stats.last_post_at is not None and post.pub_date >= stats.last_post_at:
+        # Удалён самый свежий пост — дату берём из оставшихся.
+        changes['last_post_at'] = (
+            visible_posts(group_id)
+            .exclude(pk=post.pk)
+            .aggregate(last=Max('pub_date'))['last']
+        )
+    GroupStats.objects.filter(pk=group_id).update(**changes)
@@ -0,0 +1,80 @@
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+import numpy as np
+
+from ...constants import RECOMMENDATIONS_COUNT
+from ...models import Follow, Recommendation
+from ...recommendations import load_graph, recommend
+
+# Пользователей в одной транзакции записи: SQLite держит блокировку
+# записи только на время замены рекомендаций одной пачки.
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    """Пересчитывает рекомендации «на кого подписаться»
+    по графу подписок и сохраняет их в Recommendation."""
+
+    help = 'Пересчёт рекомендаций авторов для подписки'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=RECOMMENDATIONS_COUNT,
+            help='Количество рекомендаций на пользователя.',
+        )
+
+    def handle(self, *args, **options):
+        # Рёбра читаются сразу в массив numpy, без списка кортежей.
+        edges = np.fromiter(
+            chain.from_iterable(
+                Follow.objects.values_list('user_id', 'author_id').iterator()
+            ),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        ids, indptr, indices = load_graph(edges)
+        stale = set(
+            Recommendation.objects.values_list('user_id', flat=True)
+            .distinct()
+            .iterator()
+        )
+        batch = {}
+        users = 0
+        for user_id, authors in recommend(
+            ids, indptr, indices, options['limit']
+        ):
+            users += 1
+            batch[int(user_id)] = authors
+            if len(batch) >= BATCH_SIZE:
+                self.replace(batch)
+                stale.difference_update(batch)
+                batch = {}
+        self.replace(batch)
+        stale.difference_update(batch)
+        # Пользователи, у которых больше нет подписок.
+        stale = list(stale)
+        for start in range(0, len(stale), BATCH_SIZE):
+            Recommendation.objects.filter(
+                user_id__in=stale[start:start + BATCH_SIZE]
+            ).delete()
+        self.stdout.write(
+            f'Рекомендации пересчитаны для {users} пользователей'
+        )
+
+    def replace(self, batch):
+        """Заменяет рекомендации пачки пользователей одной
+        короткой транзакцией."""
+        if not batch:
+            return
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=batch).delete()
+            Recommendation.objects.bulk_create(
+                Recommendation(
+                    user_id=user_id, author_id=author_id, score=score
+                )
+                for user_id, authors in batch.items()
+                for author_id, score in authors
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from ...deletion import process_deletions
+
+
+class Command(BaseCommand):
+    """Физически удаляет скрытых пользователей, группы и посты.
+    Запускается по расписанию; каждая транзакция затрагивает
+    не больше --chunk-size строк."""
+
+    help = 'Удаление объектов из очереди на удаление'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--limit', type=int, default=None)
+
+    def handle(self, *args, **options):
+        processed = process_deletions(
+            options['chunk_size'], limit=options['limit']
+        )
+        self.stdout.write(f'Обработано запросов на удаление: {processed}')
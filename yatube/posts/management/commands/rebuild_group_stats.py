@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...group_stats import rebuild_all
+
+
+class Command(BaseCommand):
+    """Пересчитывает статистику групп с нуля, например после
+    массового импорта постов в обход сигналов."""
+
+    help = 'Пересчёт статистики групп'
+
+    def handle(self, *args, **options):
+        rebuild_all()
+        self.stdout.write('Статистика групп пересчитана')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Comment, Post
+from ...rendering import render_text
+
+
+class Command(BaseCommand):
+    """Заполняет text_html у постов и комментариев. Нужна после
+    миграции и после смены TEXT_RENDERER (с флагом --all)."""
+
+    help = 'Рендеринг текста постов и комментариев в HTML'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перерендерить все записи, а не только пустые.',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            rendered = self.render(
+                model, options['batch_size'], options['all']
+            )
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {rendered}')
+
+    def render(self, model, batch_size, everything):
+        queryset = model.all_objects.only('text', 'text_html').order_by('pk')
+        if not everything:
+            queryset = queryset.filter(text_html='')
+        rendered = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return rendered
+            for obj in batch:
+                obj.text_html = render_text(obj.text)
+            model.all_objects.bulk_update(batch, ('text_html',))
+            rendered += len(batch)
+            last_pk = batch[-1].pk
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from ...constants import DIGEST_BATCH_SIZE
+from ...digest import send_digests
+
+
+class Command(BaseCommand):
+    """Ежедневная рассылка новых постов авторов, на которых
+    подписан пользователь. Запускается по расписанию."""
+
+    help = 'Рассылка дайджеста новых постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DIGEST_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Поставить порции в фоновую очередь.',
+        )
+
+    def handle(self, *args, **options):
+        sent = send_digests(options['batch_size'], queue=options['queue'])
+        if options['queue']:
+            self.stdout.write('Порции дайджеста поставлены в очередь')
+        else:
+            self.stdout.write(f'Отправлено писем: {sent}')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import User
+from ...takeout import takeout_stream
+
+
+class Command(BaseCommand):
+    """Выгружает данные пользователя в zip-архив на диск.
+    Архив пишется порциями, как и при скачивании с сайта."""
+
+    help = 'Выгрузка постов, комментариев и картинок пользователя'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('output', help='Путь к zip-файлу.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'Нет пользователя {options["username"]}')
+        with open(options['output'], 'wb') as output:
+            for chunk in takeout_stream(user):
+                output.write(chunk)
+        self.stdout.write(f'Архив записан в {options["output"]}')
@@ -0,0 +1,73 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:27
+
+import datetime
+import math
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Значения posts.constants и формулы posts.trending на момент
+# миграции: код приложения может измениться позже.
+HOT_EPOCH = datetime.datetime(2022, 1, 1, tzinfo=timezone.utc)
+DECAY = math.log(2) / (60 * 60 * 12)
+BATCH_SIZE = 1000
+
+
+def event_score(moment, weight=1):
+    return math.log(weight) + DECAY * (moment - HOT_EPOCH).total_seconds()
+
+
+def add_scores(first, second):
+    high, low = max(first, second), min(first, second)
+    return high + math.log1p(math.exp(low - high))
+
+
+def backfill_hot_score(apps, schema_editor):
+    """Заполняет hot_score пачками: два запроса на чтение
+    и один bulk_update на BATCH_SIZE постов."""
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pub_date')[:BATCH_SIZE]
+        )
+        if not posts:
+            return
+        scores = {post.pk: event_score(post.pub_date) for post in posts}
+        comments = Comment.objects.filter(post_id__in=scores).values_list(
+            'post_id', 'created'
+        )
+        for post_id, created in comments.iterator():
+            scores[post_id] = add_scores(scores[post_id], event_score(created))
+        for post in posts:
+            post.hot_score = scores[post.pk]
+        Post.objects.bulk_update(posts, ['hot_score'])
+        last_pk = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_recommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(
+                default=0, editable=False, verbose_name='Оценка популярности'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                fields=['-hot_score', '-id'],
+                name='posts_post_hot_sco_c26496_idx',
+            ),
+        ),
+        migrations.RunPython(backfill_hot_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    groups = Group.objects.annotate(
+        total_posts=Count('posts'),
+        total_authors=Count('posts__author', distinct=True),
+        last_post=Max('posts__pub_date'),
+    )
+    GroupStats.objects.bulk_create(
+        GroupStats(
+            group=group,
+            post_count=group.total_posts,
+            author_count=group.total_authors,
+            last_post_at=group.last_post,
+        )
+        for group in groups
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                (
+                    'group',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='stats',
+                        serialize=False,
+                        to='posts.Group',
+                        verbose_name='Группа',
+                    ),
+                ),
+                (
+                    'post_count',
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        default=0,
+                        verbose_name='Количество постов',
+                    ),
+                ),
+                (
+                    'author_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Количество авторов'
+                    ),
+                ),
+                (
+                    'last_post_at',
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name='Дата последнего поста',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Статистика группы',
+                'verbose_name_plural': 'Статистика групп',
+            },
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
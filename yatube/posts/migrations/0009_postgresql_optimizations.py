@@ -0,0 +1,67 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:32
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+from posts.constants import SEARCH_CONFIG
+
+SEARCH_INDEX = 'posts_post_text_search_idx'
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    duplicates = (
+        Follow.objects.values('user', 'author')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('user', 'author', 'first_id')
+    )
+    for user_id, author_id, first_id in duplicates:
+        Follow.objects.filter(user_id=user_id, author_id=author_id).exclude(
+            pk=first_id
+        ).delete()
+
+
+def create_search_index(apps, schema_editor):
+    # GIN-индекс по тому же выражению, что строит SearchVector:
+    # используется только на PostgreSQL.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX {SEARCH_INDEX} ON posts_post USING GIN '
+        f"(to_tsvector('{SEARCH_CONFIG}'::regconfig, COALESCE(text, '')))"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_groupstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                condition=models.Q(group__isnull=False),
+                fields=['group', '-pub_date'],
+                name='post_group_feed_idx',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_following'
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
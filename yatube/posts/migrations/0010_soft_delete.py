@@ -0,0 +1,73 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_postgresql_optimizations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionRequest',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('user', 'Пользователь'),
+                            ('group', 'Группа'),
+                            ('post', 'Пост'),
+                        ],
+                        max_length=10,
+                        verbose_name='Тип объекта',
+                    ),
+                ),
+                (
+                    'object_id',
+                    models.PositiveIntegerField(verbose_name='id объекта'),
+                ),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Запрос на удаление',
+                'verbose_name_plural': 'Запросы на удаление',
+                'ordering': ('created',),
+            },
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='is_deleted',
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                verbose_name='Помечена на удаление',
+            ),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_deleted',
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                verbose_name='Помечен на удаление',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='deletionrequest',
+            constraint=models.UniqueConstraint(
+                fields=('kind', 'object_id'), name='unique_deletion_request'
+            ),
+        ),
+    ]
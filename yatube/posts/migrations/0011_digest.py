@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0010_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Digest',
+            fields=[
+                (
+                    'user',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='digest',
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='Пользователь',
+                    ),
+                ),
+                (
+                    'last_sent_at',
+                    models.DateTimeField(
+                        verbose_name='Дата последней рассылки'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Дайджест',
+                'verbose_name_plural': 'Дайджесты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                fields=['author', '-pub_date'], name='post_author_feed_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('comment', 'Комментарий'),
+                            ('follow', 'Подписка'),
+                        ],
+                        max_length=10,
+                        verbose_name='Тип',
+                    ),
+                ),
+                (
+                    'is_read',
+                    models.BooleanField(
+                        default=False, verbose_name='Прочитано'
+                    ),
+                ),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                (
+                    'actor',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='Инициатор',
+                    ),
+                ),
+                (
+                    'post',
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='posts.Post',
+                        verbose_name='Пост',
+                    ),
+                ),
+                (
+                    'recipient',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='notifications',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='Получатель',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Уведомление',
+                'verbose_name_plural': 'Уведомления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(
+                fields=['recipient', '-id'],
+                name='posts_notif_recipie_1bb815_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(
+                condition=models.Q(is_read=False),
+                fields=['recipient'],
+                name='notification_unread_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                verbose_name='Текст комментария в HTML',
+            ),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(
+                blank=True, editable=False, verbose_name='Текст поста в HTML'
+            ),
+        ),
+    ]
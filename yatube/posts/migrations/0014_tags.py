@@ -0,0 +1,126 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import re
+
+# Копия регулярки на момент миграции: код приложения может меняться.
+HASHTAG_RE = re.compile(r'(?<![\w&])#(\w{1,50})')
+
+
+def fill_post_tags(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Tag = apps.get_model('posts', 'Tag')
+    PostTag = apps.get_model('posts', 'PostTag')
+    post_names = {}
+    posts = Post.objects.filter(text__contains='#').values_list('pk', 'text')
+    for pk, text in posts.iterator():
+        names = {name.lower() for name in HASHTAG_RE.findall(text)}
+        if names:
+            post_names[pk] = names
+    all_names = set().union(*post_names.values())
+    Tag.objects.bulk_create(
+        (Tag(name=name) for name in all_names), ignore_conflicts=True
+    )
+    tag_ids = dict(
+        Tag.objects.filter(name__in=all_names).values_list('name', 'pk')
+    )
+    PostTag.objects.bulk_create(
+        (
+            PostTag(post_id=pk, tag_id=tag_ids[name])
+            for pk, names in post_names.items()
+            for name in names
+        ),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'name',
+                    models.CharField(
+                        max_length=50, unique=True, verbose_name='Хештег'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Хештег',
+                'verbose_name_plural': 'Хештеги',
+            },
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(
+                choices=[
+                    ('comment', 'Комментарий'),
+                    ('follow', 'Подписка'),
+                    ('mention', 'Упоминание'),
+                ],
+                max_length=10,
+                verbose_name='Тип',
+            ),
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'post',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='post_tags',
+                        to='posts.Post',
+                        verbose_name='Пост',
+                    ),
+                ),
+                (
+                    'tag',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='post_tags',
+                        to='posts.Tag',
+                        verbose_name='Хештег',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Хештег поста',
+                'verbose_name_plural': 'Хештеги постов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='posttag',
+            constraint=models.UniqueConstraint(
+                fields=('tag', 'post'), name='unique_post_tag'
+            ),
+        ),
+        migrations.RunPython(fill_post_tags, migrations.RunPython.noop),
+    ]
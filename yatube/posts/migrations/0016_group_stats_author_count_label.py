@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='groupstats',
+            name='author_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='Количество авторов за всё время'
+            ),
+        ),
+    ]
@@ -3,10 +3,58 @@ from django.contrib.auth import get_user_model
 from django.db.models import UniqueConstraint
 
 from .constants import POST_STRING_SIZE
+from .rendering import RenderedTextMixin
 
 User = get_user_model()
 
 
+class VisibleGroupManager(models.Manager):
+    """Менеджер групп без помеченных на удаление."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+def pending_user_deletions():
+    """Подзапрос id пользователей из очереди удаления.
+
+    Отдельный признак вместо is_active: контент просто
+    деактивированного аккаунта остаётся на сайте.
+    """
+    return DeletionRequest.objects.filter(
+        kind=DeletionRequest.USER
+    ).values('object_id')
+
+
+def visible_users():
+    return User.objects.exclude(pk__in=pending_user_deletions())
+
+
+class VisiblePostManager(models.Manager):
+    """Менеджер постов без помеченных на удаление
+    и без постов удаляемых пользователей."""
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .filter(is_deleted=False)
+            .exclude(author__in=pending_user_deletions())
+        )
+
+
+class VisibleCommentManager(models.Manager):
+    """Менеджер комментариев без комментариев
+    удаляемых пользователей."""
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .exclude(author__in=pending_user_deletions())
+        )
+
+
 class Group(models.Model):
     """Класс Group определеяет ключевые
     параметры группы постов.
@@ -23,12 +71,54 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Описание группы',
     )
+    is_deleted = models.BooleanField(
+        verbose_name='Помечена на удаление',
+        default=False,
+        editable=False,
+    )
+
+    objects = VisibleGroupManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.title
 
 
-class Post(models.Model):
+class GroupStats(models.Model):
+    """Класс GroupStats хранит заранее посчитанную статистику
+    группы для каталога групп. Обновляется сигналами Post
+    и командой rebuild_group_stats.
+    """
+
+    group = models.OneToOneField(
+        Group,
+        verbose_name='Группа',
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+    )
+    post_count = models.PositiveIntegerField(
+        verbose_name='Количество постов',
+        default=0,
+        db_index=True,
+    )
+    author_count = models.PositiveIntegerField(
+        verbose_name='Количество авторов за всё время',
+        default=0,
+    )
+    last_post_at = models.DateTimeField(
+        verbose_name='Дата последнего поста',
+        blank=True,
+        null=True,
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+
+
+class Post(RenderedTextMixin, models.Model):
     """Класс Post используется для задания
     параметров отображения постов на сайте.
     """
@@ -36,6 +126,11 @@ class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста',
     )
+    text_html = models.TextField(
+        verbose_name='Текст поста в HTML',
+        editable=False,
+        blank=True,
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
         auto_now_add=True,
@@ -58,9 +153,35 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка', upload_to='posts/', blank=True, null=True
     )
+    hot_score = models.FloatField(
+        verbose_name='Оценка популярности',
+        default=0,
+        editable=False,
+    )
+    is_deleted = models.BooleanField(
+        verbose_name='Помечен на удаление',
+        default=False,
+        editable=False,
+    )
+
+    objects = VisiblePostManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('-hot_score', '-id')),
+            models.Index(
+                name='post_group_feed_idx',
+                fields=('group', '-pub_date'),
+                condition=models.Q(group__isnull=False),
+            ),
+            models.Index(
+                name='post_author_feed_idx',
+                fields=('author', '-pub_date'),
+            ),
+            models.Index(name='post_pub_date_idx', fields=('-pub_date',)),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -68,7 +189,7 @@ class Post(models.Model):
         return self.text[:POST_STRING_SIZE]
 
 
-class Comment(models.Model):
+class Comment(RenderedTextMixin, models.Model):
     """Класс Comment определеяет ключевые
     параметры комментариев к постам.
     """
@@ -80,6 +201,11 @@ class Comment(models.Model):
         related_name='comments',
     )
     text = models.TextField(verbose_name='Текст комментария')
+    text_html = models.TextField(
+        verbose_name='Текст комментария в HTML',
+        editable=False,
+        blank=True,
+    )
     author = models.ForeignKey(
         User,
         verbose_name='Имя автора',
@@ -88,8 +214,14 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = VisibleCommentManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ('-created',)
+        indexes = (
+            models.Index(name='comment_created_idx', fields=('-created',)),
+        )
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -116,6 +248,194 @@ class Follow(models.Model):
     )
 
     class Meta:
-        UniqueConstraint(name='unique_following', fields=['user', 'author'])
+        constraints = (
+            UniqueConstraint(
+                name='unique_following', fields=('user', 'author')
+            ),
+        )
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+
+
+class Recommendation(models.Model):
+    """Класс Recommendation хранит рекомендации авторов
+    для подписки, рассчитанные командой build_recommendations.
+    """
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Рекомендуемый автор',
+        on_delete=models.CASCADE,
+        related_name='recommended_to',
+    )
+    score = models.FloatField(verbose_name='Оценка')
+
+    class Meta:
+        ordering = ('-score',)
+        indexes = (models.Index(fields=('user', '-score')),)
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+
+
+class DeletionRequest(models.Model):
+    """Класс DeletionRequest — очередь фонового удаления.
+
+    Объект сразу скрывается: посты и группы флагом is_deleted,
+    пользователь — самим запросом (см. pending_user_deletions),
+    а строки и файлы удаляются порциями командой purge_deleted.
+    """
+
+    USER = 'user'
+    GROUP = 'group'
+    POST = 'post'
+    KIND_CHOICES = (
+        (USER, 'Пользователь'),
+        (GROUP, 'Группа'),
+        (POST, 'Пост'),
+    )
+
+    kind = models.CharField(
+        verbose_name='Тип объекта',
+        max_length=10,
+        choices=KIND_CHOICES,
+    )
+    object_id = models.PositiveIntegerField(verbose_name='id объекта')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('created',)
+        constraints = (
+            UniqueConstraint(
+                name='unique_deletion_request', fields=('kind', 'object_id')
+            ),
+        )
+        verbose_name = 'Запрос на удаление'
+        verbose_name_plural = 'Запросы на удаление'
+
+
+class Digest(models.Model):
+    """Класс Digest хранит время последней рассылки
+    дайджеста новых постов пользователю.
+    """
+
+    user = models.OneToOneField(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='digest',
+    )
+    last_sent_at = models.DateTimeField(
+        verbose_name='Дата последней рассылки',
+    )
+
+    class Meta:
+        verbose_name = 'Дайджест'
+        verbose_name_plural = 'Дайджесты'
+
+
+class Notification(models.Model):
+    """Класс Notification — уведомление автора о новом
+    комментарии, подписчике или упоминании.
+    """
+
+    COMMENT = 'comment'
+    FOLLOW = 'follow'
+    MENTION = 'mention'
+    KINDS = (
+        (COMMENT, 'Комментарий'),
+        (FOLLOW, 'Подписка'),
+        (MENTION, 'Упоминание'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        verbose_name='Получатель',
+        on_delete=models.CASCADE,
+        related_name='notifications',
+    )
+    actor = models.ForeignKey(
+        User,
+        verbose_name='Инициатор',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    kind = models.CharField(
+        verbose_name='Тип',
+        max_length=10,
+        choices=KINDS,
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    is_read = models.BooleanField(
+        verbose_name='Прочитано',
+        default=False,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('recipient', '-id')),
+            models.Index(
+                name='notification_unread_idx',
+                fields=('recipient',),
+                condition=models.Q(is_read=False),
+            ),
+        )
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+
+class Tag(models.Model):
+    """Класс Tag — хештег, извлечённый из текста постов."""
+
+    name = models.CharField(
+        verbose_name='Хештег',
+        max_length=50,
+        unique=True,
+    )
+
+    class Meta:
+        verbose_name = 'Хештег'
+        verbose_name_plural = 'Хештеги'
+
+    def __str__(self):
+        return self.name
+
+
+class PostTag(models.Model):
+    """Класс PostTag связывает пост с хештегами его текста.
+    Индекс (tag, post) обслуживает ленту хештега.
+    """
+
+    tag = models.ForeignKey(
+        Tag,
+        verbose_name='Хештег',
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+    )
+
+    class Meta:
+        constraints = (
+            UniqueConstraint(name='unique_post_tag', fields=('tag', 'post')),
+        )
+        verbose_name = 'Хештег поста'
+        verbose_name_plural = 'Хештеги постов'
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import UNREAD_LOCAL_TIMEOUT, UNREAD_TIMEOUT
+from .models import Notification, pending_user_deletions
+
+UNREAD_KEY = 'unread_notifications.{}'
+
+
+def unread_timeout():
+    """Счётчик периодически пересчитывается по базе, чтобы
+    расхождения не копились. В кеше процесса он расходится
+    с другими процессами, поэтому живёт меньше."""
+    return UNREAD_TIMEOUT if settings.SHARED_CACHE else UNREAD_LOCAL_TIMEOUT
+
+
+def notify(recipient_id, actor_id, kind, post_id=None):
+    """Создаёт уведомление и увеличивает закешированный счётчик
+    непрочитанных без пересчёта строк. Счётчик меняется после
+    фиксации транзакции, чтобы откат не оставлял его завышенным."""
+    notify_many((recipient_id,), actor_id, kind, post_id)
+
+
+def notify_many(recipient_ids, actor_id, kind, post_id=None):
+    """Как notify, но для нескольких получателей одним INSERT."""
+    recipient_ids = [pk for pk in recipient_ids if pk != actor_id]
+    if not recipient_ids:
+        return
+    Notification.objects.bulk_create(
+        Notification(
+            recipient_id=recipient_id,
+            actor_id=actor_id,
+            kind=kind,
+            post_id=post_id,
+        )
+        for recipient_id in recipient_ids
+    )
+
+    def increment_all():
+        for recipient_id in recipient_ids:
+            increment_unread(recipient_id)
+
+    transaction.on_commit(increment_all)
+
+
+def increment_unread(user_id):
+    try:
+        cache.incr(UNREAD_KEY.format(user_id))
+    except ValueError:
+        # Счётчика нет в кеше — он будет посчитан при чтении.
+        pass
+
+
+def unread_recipients(notifications):
+    """id получателей непрочитанных уведомлений из notifications."""
+    return set(
+        notifications.filter(is_read=False)
+        .values_list('recipient_id', flat=True)
+        .distinct()
+    )
+
+
+def forget_unread(recipient_ids):
+    """Сбрасывает счётчики, чтобы они пересчитались при чтении.
+    Вызывается, когда уведомления удаляются или скрываются."""
+    cache.delete_many([UNREAD_KEY.format(pk) for pk in recipient_ids])
+
+
+def unread_count(user_id):
+    """Количество непрочитанных уведомлений. Строки считаются
+    только при промахе кеша, дальше счётчик меняется incr/set."""
+    key = UNREAD_KEY.format(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = (
+            Notification.objects.filter(recipient_id=user_id, is_read=False)
+            .exclude(actor__in=pending_user_deletions())
+            .count()
+        )
+        cache.add(key, count, unread_timeout())
+    return count
+
+
+def mark_all_read(user_id):
+    Notification.objects.filter(recipient_id=user_id, is_read=False).update(
+        is_read=True
+    )
+    cache.set(UNREAD_KEY.format(user_id), 0, unread_timeout())
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def load_graph(edges):
+    """Строит из пар (подписчик, автор) граф в формате CSR.
+
+    Возвращает (ids, indptr, indices): ids — исходные id
+    пользователей, подписки пользователя с номером i лежат
+    в indices[indptr[i]:indptr[i + 1]] (номера, а не id).
+    """
+    if len(edges) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, np.zeros(1, dtype=np.int64), empty
+    ids, dense = np.unique(
+        np.asarray(edges, dtype=np.int64), return_inverse=True
+    )
+    dense = dense.reshape(-1, 2)
+    order = np.lexsort((dense[:, 1], dense[:, 0]))
+    sources, targets = dense[order, 0], dense[order, 1]
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(ids)), out=indptr[1:])
+    return ids, indptr, targets
+
+
+def recommend(ids, indptr, indices, limit):
+    """Рекомендует авторов по числу общих соседей.
+
+    Кандидат получает по баллу за каждого автора из подписок
+    пользователя, который сам подписан на кандидата. Если
+    кандидатов меньше limit, список дополняется самыми
+    популярными авторами. Возвращает пары (id, [(id, оценка)]).
+    """
+    popularity = np.bincount(indices, minlength=len(ids))
+    popular = np.argsort(-popularity, kind='stable')
+    popular_scale = popularity.max(initial=0) + 1
+    for user in range(len(ids)):
+        following = indices[indptr[user]:indptr[user + 1]]
+        if len(following) == 0:
+            continue
+        second_hop = np.concatenate(
+            [
+                indices[indptr[author]:indptr[author + 1]]
+                for author in following
+            ]
+        )
+        candidates, scores = np.unique(second_hop, return_counts=True)
+        known = np.isin(candidates, following) | (candidates == user)
+        candidates = candidates[~known]
+        scores = scores[~known].astype(np.float64)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        result = list(zip(ids[candidates[order]], scores[order]))
+
+        if len(result) < limit:
+            # Популярные авторы получают оценку меньше любой
+            # оценки по общим соседям.
+            # Обход по убыванию популярности останавливается, как
+            # только набрано limit авторов: пропустить можно не больше
+            # len(exclude) из них.
+            exclude = set(following.tolist())
+            exclude.update(candidates.tolist())
+            exclude.add(user)
+            for author in popular:
+                if len(result) >= limit or popularity[author] == 0:
+                    break
+                if author in exclude:
+                    continue
+                result.append(
+                    (ids[author], popularity[author] / popular_scale)
+                )
+        yield ids[user], [
+            (int(author), float(score)) for author, score in result
+        ]
@@ -0,0 +1,86 @@
+import re
+
+from django.conf import settings
+from django.template.defaultfilters import linebreaksbr
+from django.urls import reverse
+from django.utils.html import escape, format_html
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+from django.utils.text import normalize_newlines
+
+# Регулярки применяются к исходному тексту и при извлечении,
+# и при рендеринге, поэтому ссылки совпадают с таблицей тегов.
+# Слово длиннее 50 символов хештегом не считается.
+HASHTAG_RE = re.compile(r'(?<!\w)#(\w{1,50})(?!\w)')
+MENTION_RE = re.compile(r'(?<![\w@])@(\w(?:[\w.+-]*[\w+-])?)')
+TOKEN_RE = re.compile(f'{HASHTAG_RE.pattern}|{MENTION_RE.pattern}')
+
+
+def plain_text(text):
+    """Рендерер по умолчанию: экранирует текст и переносит строки,
+    как фильтр linebreaksbr в шаблонах."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def existing_usernames(names):
+    """Имена из names, под которыми зарегистрированы пользователи."""
+    if not names:
+        return set()
+    from django.contrib.auth import get_user_model
+
+    return set(
+        get_user_model()
+        .objects.filter(username__in=names)
+        .values_list('username', flat=True)
+    )
+
+
+def linked_text(text):
+    """Как plain_text, но хештеги и упоминания существующих
+    пользователей становятся ссылками на ленту хештега и профиль."""
+    text = normalize_newlines(text)
+    usernames = existing_usernames(set(MENTION_RE.findall(text)))
+    parts = []
+    position = 0
+    for match in TOKEN_RE.finditer(text):
+        tag, username = match.groups()
+        if tag:
+            link = format_html(
+                '<a href="{}">#{}</a>',
+                reverse('posts:tag', args=(tag.lower(),)),
+                tag,
+            )
+        elif username in usernames:
+            link = format_html(
+                '<a href="{}">@{}</a>',
+                reverse('posts:profile', args=(username,)),
+                username,
+            )
+        else:
+            continue
+        parts.append(escape(text[position:match.start()]))
+        parts.append(link)
+        position = match.end()
+    parts.append(escape(text[position:]))
+    return ''.join(parts).replace('\n', '<br>')
+
+
+def render_text(text):
+    """Переводит текст поста или комментария в HTML.
+
+    Рендерер задаётся настройкой TEXT_RENDERER и обязан сам
+    экранировать пользовательский ввод: результат выводится
+    в шаблонах без повторного экранирования.
+    """
+    return import_string(settings.TEXT_RENDERER)(text)
+
+
+class RenderedTextMixin:
+    """Доступ к HTML, сохранённому в поле text_html. Строки,
+    ещё не обработанные командой render_texts, рендерятся на лету."""
+
+    @property
+    def rendered_text(self):
+        if not self.text_html and self.text:
+            return mark_safe(render_text(self.text))
+        return mark_safe(self.text_html)
@@ -0,0 +1,144 @@
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import group_stats
+from .digest import invalidate_fragment
+from .events import publish_comment, publish_post
+from .models import Comment, Follow, Notification, Post
+from .notifications import notify
+from .rendering import render_text
+from .tags import sync_tags
+from .trending import bump_post, event_score
+from .utils import invalidate_followed_author_ids
+
+# Значение отложенного поля, которое ещё не загружалось.
+DEFERRED = object()
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_set(sender, instance, **kwargs):
+    """Сбрасывает закешированные подписки пользователя."""
+    invalidate_followed_author_ids(instance.user_id)
+
+
+@receiver(pre_save, sender=Post)
+def init_hot_score(sender, instance, **kwargs):
+    """Новый пост начинает с оценки, равной весу публикации."""
+    if instance.pk is None and not instance.hot_score:
+        instance.hot_score = event_score(timezone.now())
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def store_rendered_text(sender, instance, **kwargs):
+    """Рендерит текст один раз при сохранении, а не в каждой ленте."""
+    instance.text_html = render_text(instance.text)
+
+
+@receiver(post_save, sender=Comment)
+def bump_commented_post(sender, instance, created, **kwargs):
+    """Комментарий поднимает пост в ленте популярного."""
+    if created:
+        bump_post(instance.post_id, instance.created)
+
+
+@receiver(post_save, sender=Post)
+def refresh_digest_fragment(sender, instance, created, **kwargs):
+    """Отредактированный пост попадёт в дайджест с новым текстом."""
+    if not created:
+        invalidate_fragment(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def notify_post_author(sender, instance, created, **kwargs):
+    """Сообщает автору поста о новом комментарии."""
+    if created:
+        notify(
+            instance.post.author_id,
+            instance.author_id,
+            Notification.COMMENT,
+            instance.post_id,
+        )
+
+
+@receiver(post_save, sender=Post)
+def announce_post(sender, instance, created, **kwargs):
+    """Сообщает открытым страницам о новом посте."""
+    if created:
+        publish_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def announce_comment(sender, instance, created, **kwargs):
+    if created:
+        publish_comment(instance)
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    """Запоминает исходную группу, чтобы заметить её смену.
+    Отложенное поле не загружается: лишний запрос на каждый пост."""
+    instance._stats_group_id = instance.__dict__.get('group_id', DEFERRED)
+
+
+@receiver(post_init, sender=Post)
+def remember_text(sender, instance, **kwargs):
+    # Отложенное поле не загружается: лишний запрос на каждый пост.
+    instance._original_text = instance.__dict__.get('text')
+
+
+@receiver(post_save, sender=Post)
+def update_tags(sender, instance, created, **kwargs):
+    """Извлекает хештеги и упоминания, если текст изменился."""
+    old_text = '' if created else instance._original_text
+    if old_text != instance.text:
+        sync_tags(instance, old_text)
+    instance._original_text = instance.text
+
+
+@receiver(pre_save, sender=Post)
+def load_deferred_group(sender, instance, **kwargs):
+    """Исходную группу отложенного поля читает из базы, только
+    если поле загрузили или изменили до сохранения."""
+    if (
+        instance._stats_group_id is DEFERRED
+        and 'group_id' in instance.__dict__
+        and instance.pk is not None
+    ):
+        instance._stats_group_id = (
+            Post.all_objects.filter(pk=instance.pk)
+            .values_list('group_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def update_group_stats(sender, instance, created, **kwargs):
+    """Обновляет статистику групп при создании и переносе поста."""
+    if not created and instance._stats_group_id is DEFERRED:
+        # Группа не загружалась, значит, и не менялась.
+        return
+    old_group_id = None if created else instance._stats_group_id
+    if old_group_id != instance.group_id:
+        if old_group_id is not None:
+            group_stats.post_removed(instance, old_group_id)
+        if instance.group_id is not None:
+            group_stats.post_added(instance, instance.group_id)
+    instance._stats_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_group_stats(sender, instance, **kwargs):
+    group_id = instance._stats_group_id
+    if group_id is DEFERRED:
+        group_id = instance.group_id
+    # Скрытый пост вычтен из статистики ещё в schedule_deletion.
+    if group_id is not None and not instance.is_deleted:
+        group_stats.post_removed(instance, group_id)
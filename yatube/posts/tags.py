@@ -0,0 +1,58 @@
+from .constants import MENTIONS_PER_POST
+from .models import Notification, PostTag, Tag, User
+from .notifications import notify_many
+from .rendering import HASHTAG_RE, MENTION_RE
+
+
+def extract_hashtags(text):
+    return {name.lower() for name in HASHTAG_RE.findall(text)}
+
+
+def extract_mentions(text):
+    return set(MENTION_RE.findall(text))
+
+
+def sync_tags(post, old_text=None):
+    """Обновляет хештеги поста и уведомляет новых упомянутых.
+
+    Вызывается при сохранении, так что лента хештега читает
+    готовую таблицу без поиска по тексту. old_text — текст до
+    изменения; None, если он не загружался: тогда хештеги
+    сверяются с базой, а уведомления не отправляются.
+    """
+    names = extract_hashtags(post.text)
+    if old_text is None or names != extract_hashtags(old_text):
+        if names:
+            Tag.objects.bulk_create(
+                (Tag(name=name) for name in names), ignore_conflicts=True
+            )
+        PostTag.objects.filter(post=post).exclude(tag__name__in=names).delete()
+        PostTag.objects.bulk_create(
+            (
+                PostTag(post=post, tag_id=tag_id)
+                for tag_id in Tag.objects.filter(name__in=names).values_list(
+                    'pk', flat=True
+                )
+            ),
+            ignore_conflicts=True,
+        )
+
+    if old_text is None:
+        return
+    # Не больше MENTIONS_PER_POST новых упоминаний в порядке текста:
+    # уведомления создаются в запросе сохранения.
+    known = extract_mentions(old_text)
+    mentioned = [
+        name
+        for name in dict.fromkeys(MENTION_RE.findall(post.text))
+        if name not in known
+    ][:MENTIONS_PER_POST]
+    if mentioned:
+        notify_many(
+            User.objects.filter(
+                username__in=mentioned, is_active=True
+            ).values_list('pk', flat=True),
+            post.author_id,
+            Notification.MENTION,
+            post.pk,
+        )
@@ -0,0 +1,88 @@
+import json
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.zipstream import zip_entry, zip_stream
+
+from .constants import TAKEOUT_CHUNK_SIZE
+from .models import Comment, Post
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'group__slug', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'text', 'created')
+
+
+def jsonl(rows):
+    for row in rows:
+        line = json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield (line + '\n').encode()
+
+
+def batched(queryset, chunk_size=TAKEOUT_CHUNK_SIZE):
+    """Строки queryset.values() порциями по первичному ключу.
+
+    Не полагается на серверные курсоры: за PgBouncer они
+    отключены (DISABLE_SERVER_SIDE_CURSORS) и iterator() читает
+    весь результат в память. Здесь в памяти не больше порции.
+    """
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')[:chunk_size]
+        )
+        if not rows:
+            return
+        yield from rows
+        last_pk = rows[-1]['id']
+
+
+# all_objects: выгрузка нужна и для неактивных и удаляемых аккаунтов,
+# которые менеджеры по умолчанию скрывают.
+def user_posts(user):
+    return batched(
+        Post.all_objects.filter(author=user, is_deleted=False).values(
+            *POST_FIELDS
+        )
+    )
+
+
+def user_comments(user):
+    return batched(
+        Comment.all_objects.filter(author=user).values(*COMMENT_FIELDS)
+    )
+
+
+def user_images(user):
+    images = batched(
+        Post.all_objects.filter(author=user, is_deleted=False)
+        .exclude(image='')
+        .values('id', 'image')
+    )
+    return (row['image'] for row in images)
+
+
+def takeout_entries(user):
+    yield zip_entry('posts.jsonl'), jsonl(user_posts(user))
+    yield zip_entry('comments.jsonl'), jsonl(user_comments(user))
+    for name in user_images(user):
+        try:
+            image = default_storage.open(name)
+        except OSError:
+            continue
+        with image:
+            # Картинки уже сжаты, повторно их не жмём.
+            yield (
+                zip_entry(f'media/{name}', zipfile.ZIP_STORED),
+                image.chunks(),
+            )
+
+
+def takeout_stream(user):
+    """Zip-архив с постами, комментариями и картинками пользователя.
+
+    Строки читаются из БД порциями по TAKEOUT_CHUNK_SIZE (keyset),
+    а архив собирается на лету, так что память не зависит от объёма
+    данных.
+    """
+    return zip_stream(takeout_entries(user))
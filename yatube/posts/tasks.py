@@ -0,0 +1,16 @@
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+
+from .constants import THUMBNAIL_GEOMETRY, THUMBNAIL_OPTIONS
+from .models import Post
+
+
+@task()
+def make_thumbnail(post_id):
+    """Строит миниатюру заранее, чтобы первый просмотр поста
+    не ждал обработки изображения."""
+    post = Post.all_objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
@@ -0,0 +1,12 @@
+from django import template
+
+from ..constants import FEED_CURSOR_FIELD
+from ..utils import keyset_cursor
+
+register = template.Library()
+
+
+@register.filter
+def feed_cursor(post):
+    """Курсор ленты, с которого продолжается прокрутка после post."""
+    return keyset_cursor(post, FEED_CURSOR_FIELD)
@@ -0,0 +1,13 @@
+from django import template
+
+from ..notifications import unread_count
+
+register = template.Library()
+
+
+@register.simple_tag
+def unread_notifications(user):
+    """Счётчик непрочитанных уведомлений для шапки сайта."""
+    if not user.is_authenticated:
+        return 0
+    return unread_count(user.pk)
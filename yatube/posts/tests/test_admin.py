@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, DeletionRequest, Follow, Group, Post
+
+User = get_user_model()
+
+
+class AdminChangelistTests(TestCase):
+    """Тесты списков админки для больших таблиц."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@ya.ru', 'password'
+        )
+        cls.group = Group.objects.create(title='Группа', slug='group')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        # Пользователь сессии кешируется при первом запросе.
+        self.client.get(reverse('admin:index'))
+
+    def add_rows(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                author=self.admin, text=f'#{i}', group=self.group
+            )
+            reader = User.objects.create_user(username=f'reader{post.pk}')
+            Comment.objects.create(post=post, author=reader, text='ok')
+            Follow.objects.create(user=reader, author=self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(context)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Строки списка не порождают запросов к связанным моделям."""
+        for model in ('post', 'comment', 'follow'):
+            url = reverse(f'admin:posts_{model}_changelist')
+            with self.subTest(model=model):
+                self.add_rows(2)
+                few = self.count_queries(url)
+                self.add_rows(5)
+                self.assertEqual(self.count_queries(url), few)
+
+    def test_changelist_does_not_scan_dates(self):
+        """Список не выбирает все даты таблицы для навигации."""
+        url = reverse('admin:posts_post_changelist')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        self.assertFalse(
+            [q for q in context.captured_queries if 'DISTINCT' in q['sql']]
+        )
+
+    def test_post_search(self):
+        self.add_rows(5)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': '#3'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_deletion_goes_through_queue(self):
+        """Каскадное удаление отключено, пользователи удаляются
+        через очередь."""
+        for model in ('post', 'group'):
+            response = self.client.get(
+                reverse(f'admin:posts_{model}_changelist')
+            )
+            form = response.context['action_form']
+            actions = dict(form.fields['action'].choices)
+            self.assertNotIn('delete_selected', actions)
+            self.assertIn('schedule_for_deletion', actions)
+        user = User.objects.create_user(username='leaving')
+        self.client.post(
+            reverse('admin:auth_user_changelist'),
+            {'action': 'schedule_for_deletion', '_selected_action': user.pk},
+        )
+        self.assertTrue(
+            DeletionRequest.objects.filter(
+                kind=DeletionRequest.USER, object_id=user.pk
+            ).exists()
+        )
+        response = self.client.get(
+            reverse('admin:auth_user_delete', args=(user.pk,))
+        )
+        self.assertEqual(response.status_code, 403)
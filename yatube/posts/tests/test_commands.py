@@ -0,0 +1,332 @@
+import os
+import tempfile
+import zipfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import UserSession
+
+from .. import group_stats
+from ..constants import DIGEST_LOOKBACK, DIGEST_MAX_POSTS
+from ..deletion import schedule_deletion
+from ..digest import recent_posts
+from ..models import (
+    Comment,
+    DeletionRequest,
+    Digest,
+    Follow,
+    Group,
+    GroupStats,
+    Notification,
+    Post,
+    Recommendation,
+)
+
+User = get_user_model()
+
+
+class BuildRecommendationsTests(TestCase):
+    """Тесты расчёта рекомендаций по графу подписок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.friend, cls.author, cls.other = (
+            User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'author', 'other')
+        )
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+        Follow.objects.create(user=cls.other, author=cls.author)
+        Follow.objects.create(user=cls.other, author=cls.friend)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_friend_of_friend_is_recommended(self):
+        """Автор, на которого подписаны подписки, рекомендуется."""
+        call_command('build_recommendations', verbosity=0)
+        recommended = Recommendation.objects.filter(user=self.reader)
+        self.assertEqual(recommended[0].author, self.author)
+        self.assertFalse(recommended.filter(author=self.friend).exists())
+        self.assertFalse(recommended.filter(author=self.reader).exists())
+
+    def test_author_pending_deletion_is_not_recommended(self):
+        """Автор из очереди удаления пропадает из рекомендаций."""
+        call_command('build_recommendations', verbosity=0)
+        schedule_deletion(self.author)
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertNotIn(
+            self.author,
+            [item.author for item in response.context['recommendations']],
+        )
+
+    def test_rebuild_drops_users_without_follows(self):
+        """Рекомендации пользователя без подписок удаляются,
+        рекомендации остальных заменяются."""
+        call_command('build_recommendations', verbosity=0)
+        before = Recommendation.objects.filter(user=self.friend).count()
+        Follow.objects.filter(user=self.reader).delete()
+        call_command('build_recommendations', verbosity=0)
+        self.assertFalse(
+            Recommendation.objects.filter(user=self.reader).exists()
+        )
+        self.assertEqual(
+            Recommendation.objects.filter(user=self.friend).count(), before
+        )
+
+    def test_recommendations_on_follow_index(self):
+        """Рекомендации выводятся на странице подписок."""
+        call_command('build_recommendations', verbosity=0)
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            response.context['recommendations'][0].author, self.author
+        )
+
+    def test_followed_author_is_not_recommended(self):
+        """Автор, на которого подписались после расчёта,
+        пропадает из рекомендаций без пересчёта."""
+        call_command('build_recommendations', verbosity=0)
+        client = Client()
+        client.force_login(self.reader)
+        client.get(reverse('posts:profile_follow', args=(self.author,)))
+        response = client.get(reverse('posts:follow_index'))
+        self.assertNotIn(
+            self.author,
+            [item.author for item in response.context['recommendations']],
+        )
+
+
+class PurgeDeletedTests(TestCase):
+    """Тесты мягкого удаления и фоновой очистки."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='leaving')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='purge')
+        self.posts = Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author, group=self.group)
+            for i in range(5)
+        )
+        for post in Post.objects.all():
+            Comment.objects.create(post=post, author=self.reader, text='ok')
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def test_deleted_user_hidden_immediately(self):
+        """Посты и профиль удалённого автора скрываются сразу."""
+        schedule_deletion(self.author)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(Post.all_objects.count(), 5)
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_deactivated_user_content_stays_visible(self):
+        """Просто деактивированный аккаунт не скрывает контент."""
+        User.objects.filter(pk=self.author.pk).update(is_active=False)
+        self.assertEqual(Post.objects.count(), 5)
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,))
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(USER_CACHE_TIMEOUT=60)
+    def test_deleted_user_is_logged_out(self):
+        """Удаляемый пользователь теряет сессии: сразу через сброс
+        кеша, а строки сессий удаляет очистка."""
+        client = Client()
+        client.force_login(self.author)
+        url = reverse('posts:follow_index')
+        self.assertEqual(client.get(url).status_code, 200)
+        schedule_deletion(self.author)
+        self.assertEqual(client.get(url).status_code, 302)
+        call_command('purge_deleted', stdout=StringIO())
+        self.assertFalse(Session.objects.exists())
+
+    def test_purge_deletes_only_tracked_user_sessions(self):
+        """Очистка удаляет сессии удаляемого пользователя по записям
+        UserSession и не трогает чужие сессии."""
+        Client().force_login(self.author)
+        Client().force_login(self.reader)
+        schedule_deletion(self.author)
+        call_command('purge_deleted', stdout=StringIO())
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertEqual(
+            list(UserSession.objects.values_list('user', flat=True)),
+            [self.reader.pk],
+        )
+
+    def test_purge_post_deletes_notifications_in_chunks(self):
+        """Уведомления о посте удаляются порциями до самого поста."""
+        post = Post.objects.first()
+        Notification.objects.bulk_create(
+            Notification(
+                recipient=self.author,
+                actor=self.reader,
+                kind=Notification.COMMENT,
+                post=post,
+            )
+            for _ in range(5)
+        )
+        schedule_deletion(post)
+        with CaptureQueriesContext(connection) as queries:
+            call_command(
+                'purge_deleted', '--chunk-size', '2', stdout=StringIO()
+            )
+        self.assertFalse(Notification.objects.filter(post=post).exists())
+        chunks = [
+            query['sql']
+            for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "posts_notification"')
+            and '"posts_notification"."id" IN' in query['sql']
+        ]
+        self.assertEqual(len(chunks), 3)
+
+    def test_hidden_post_leaves_group_stats(self):
+        """Скрытый пост сразу вычитается из статистики группы,
+        а очистка не вычитает его второй раз."""
+        group_stats.rebuild_all()
+        schedule_deletion(Post.objects.first())
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.post_count, 4)
+        call_command('purge_deleted', stdout=StringIO())
+        stats.refresh_from_db()
+        self.assertEqual(stats.post_count, 4)
+        self.assertEqual(stats.author_count, 1)
+
+    def test_purge_removes_user_in_chunks(self):
+        """Очистка удаляет автора и все связанные строки."""
+        schedule_deletion(self.author)
+        call_command('purge_deleted', '--chunk-size', '2', stdout=StringIO())
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Comment.all_objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(DeletionRequest.objects.exists())
+
+    def test_purge_group_keeps_posts(self):
+        """Удаление группы открепляет её посты."""
+        schedule_deletion(self.group)
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,))
+        )
+        self.assertEqual(response.status_code, 404)
+        call_command('purge_deleted', '--chunk-size', '2', stdout=StringIO())
+        self.assertFalse(Group.all_objects.exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 5)
+
+
+class SendDigestsTests(TestCase):
+    """Тесты рассылки дайджеста новых постов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='writer')
+        cls.readers = [
+            User.objects.create_user(
+                username=f'reader{i}', email=f'reader{i}@ya.ru'
+            )
+            for i in range(4)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=cls.author) for reader in cls.readers
+        )
+        User.objects.create_user(username='lonely', email='lonely@ya.ru')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_digest_sent_once_per_new_posts(self):
+        """Письмо получают подписчики, повторно — только
+        при появлении новых постов."""
+        Post.objects.create(text='Свежий пост', author=self.author)
+        call_command('send_digests', '--batch-size', '3', stdout=StringIO())
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(reader.email for reader in self.readers),
+        )
+        self.assertIn('Свежий пост', mail.outbox[0].body)
+        self.assertEqual(Digest.objects.count(), len(self.readers))
+        call_command('send_digests', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), len(self.readers))
+
+    def test_queries_do_not_depend_on_batch_size(self):
+        """Число запросов на порцию не растёт с её размером."""
+        Post.objects.create(text='Пост', author=self.author)
+        with CaptureQueriesContext(connection) as small:
+            call_command(
+                'send_digests', '--batch-size', '10', stdout=StringIO()
+            )
+        Digest.objects.all().delete()
+        more = User.objects.create_user(username='more', email='m@ya.ru')
+        Follow.objects.create(user=more, author=self.author)
+        with CaptureQueriesContext(connection) as large:
+            call_command(
+                'send_digests', '--batch-size', '10', stdout=StringIO()
+            )
+        self.assertEqual(len(small), len(large))
+
+    def test_posts_limited_per_author(self):
+        """Из базы читается не больше DIGEST_MAX_POSTS постов
+        на автора, остальные только считаются."""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author)
+            for i in range(DIGEST_MAX_POSTS + 5)
+        )
+        posts, totals = recent_posts(
+            {self.author.pk},
+            timezone.now() - DIGEST_LOOKBACK,
+            timezone.now(),
+        )
+        self.assertEqual(len(posts), DIGEST_MAX_POSTS)
+        self.assertEqual(totals[self.author.pk], DIGEST_MAX_POSTS + 5)
+        call_command('send_digests', stdout=StringIO())
+        self.assertIn('И ещё постов: 5.', mail.outbox[0].body)
+
+
+class RenderTextsTests(TestCase):
+    """Тесты команды рендеринга текста в HTML."""
+
+    def test_backfill_fills_empty_html(self):
+        """Записи без text_html получают экранированный HTML."""
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(text=f'<b>{i}</b>\nстрока', author=author) for i in range(3)
+        )
+        self.assertFalse(Post.objects.exclude(text_html='').exists())
+        call_command('render_texts', '--batch-size', '2', stdout=StringIO())
+        post = Post.objects.first()
+        self.assertEqual(post.text_html, '&lt;b&gt;2&lt;/b&gt;<br>строка')
+
+
+class TakeoutCommandTests(TestCase):
+    """Тесты выгрузки архива пользователя командой takeout."""
+
+    def test_archive_is_written_to_file(self):
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='Пост')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'takeout.zip')
+            call_command('takeout', 'author', path, stdout=StringIO())
+            with zipfile.ZipFile(path) as archive:
+                self.assertEqual(
+                    archive.namelist(), ['posts.jsonl', 'comments.jsonl']
+                )
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('takeout', 'nobody', os.devnull)
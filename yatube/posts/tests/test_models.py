@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
 
 from ..constants import POST_STRING_SIZE
-from ..models import Group, Post
+from ..models import Group, GroupStats, Post
 
 User = get_user_model()
 
@@ -38,3 +40,96 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     model, expected_value, 'Ошибка метода __str__'
                 )
+
+
+class RenderedTextTest(TestCase):
+    def test_text_rendered_on_save(self):
+        """HTML текста сохраняется вместе с постом и комментарием."""
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(author=author, text='<i>a</i>\nb')
+        self.assertEqual(post.text_html, '&lt;i&gt;a&lt;/i&gt;<br>b')
+        comment = post.comments.create(author=author, text='x\ny')
+        self.assertEqual(comment.text_html, 'x<br>y')
+
+
+class GroupStatsTest(TestCase):
+    """Тесты поддержки статистики групп сигналами Post."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.second_group = Group.objects.create(
+            title='Вторая группа', slug='second', description='Описание'
+        )
+
+    def stats(self, group):
+        return GroupStats.objects.get(group=group)
+
+    def test_stats_follow_post_changes(self):
+        """Статистика меняется при создании, переносе и удалении."""
+        first = Post.objects.create(
+            author=self.author, text='Первый', group=self.group
+        )
+        Post.objects.create(
+            author=self.author, text='Второй', group=self.group
+        )
+        last = Post.objects.create(
+            author=self.other, text='Третий', group=self.group
+        )
+        stats = self.stats(self.group)
+        self.assertEqual(
+            (stats.post_count, stats.author_count, stats.last_post_at),
+            (3, 2, last.pub_date),
+        )
+
+        last.group = self.second_group
+        last.save()
+        stats = self.stats(self.group)
+        self.assertEqual((stats.post_count, stats.author_count), (2, 1))
+        self.assertEqual(self.stats(self.second_group).post_count, 1)
+
+        first.delete()
+        stats = self.stats(self.group)
+        self.assertEqual((stats.post_count, stats.author_count), (1, 1))
+
+    def test_deferred_group_is_not_loaded(self):
+        """Загрузка поста без group_id не читает группу, а перенос
+        отложенного поста всё равно учитывается."""
+        post = Post.objects.create(
+            author=self.author, text='Пост', group=self.group
+        )
+        with self.assertNumQueries(1):
+            Post.objects.only('hot_score').get(pk=post.pk)
+        deferred = Post.objects.only('text').get(pk=post.pk)
+        deferred.group = self.second_group
+        deferred.save()
+        self.assertEqual(self.stats(self.group).post_count, 0)
+        self.assertEqual(self.stats(self.second_group).post_count, 1)
+
+    def test_rebuild_matches_incremental_stats(self):
+        """Команда пересчёта даёт те же значения, что и сигналы."""
+        Post.objects.create(author=self.author, text='Пост', group=self.group)
+        Post.objects.create(author=self.other, text='Пост', group=self.group)
+        before = self.stats(self.group)
+        call_command('rebuild_group_stats', verbosity=0)
+        after = self.stats(self.group)
+        self.assertEqual(
+            (before.post_count, before.author_count, before.last_post_at),
+            (after.post_count, after.author_count, after.last_post_at),
+        )
+
+    def test_group_index_sorted_by_activity(self):
+        """Каталог групп упорядочен по дате последнего поста."""
+        Post.objects.create(author=self.author, text='Пост', group=self.group)
+        Post.objects.create(
+            author=self.author, text='Пост', group=self.second_group
+        )
+        response = self.client.get(reverse('posts:group_index'))
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.second_group, self.group],
+        )
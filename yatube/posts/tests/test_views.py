@@ -1,16 +1,47 @@
+import datetime as dt
+import html
+import io
+import json
+import re
+import shutil
+import tempfile
+import zipfile
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import (
+    Client,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
 from django.urls import reverse
 from django.core.cache import cache
 
-from ..constants import PAGIN_PAGES, POSTS_FOR_TESTING
-from ..models import Group, Post, Follow, Comment
+from core.pubsub import publish
+
+from ..constants import (
+    FEED_ORDERING,
+    MENTIONS_PER_POST,
+    PAGIN_PAGES,
+    POSTS_FOR_TESTING,
+)
+from ..deletion import purge_post, schedule_deletion
+from ..events import post_channel
+from ..models import Group, Post, Follow, Comment, Notification, Tag
+from ..notifications import unread_count
+from ..takeout import batched
+from ..templatetags.feed import feed_cursor
+from ..utils import FOLLOW_SET_KEY
 
 User = get_user_model()
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
 
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostsPagesTests(TestCase):
     """Тесты проверки views.py для приложения posts"""
 
@@ -44,6 +75,11 @@ class PostsPagesTests(TestCase):
             post=cls.post, author=cls.author, text='Комментарий'
         )
 
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         self.user = User.objects.create_user(username='user')
         self.authorized_user = Client()
@@ -217,6 +253,17 @@ class PostsPagesTests(TestCase):
         response = self.client.get(index_page)
         self.assertNotEqual(test_request, response.content)
 
+    def test_index_cache_shared_between_users(self):
+        """Закешированная главная страница общая для всех,
+        а шапка отрисовывается для каждого пользователя."""
+        index_page = reverse('posts:index')
+        self.client.get(index_page)
+        Post.objects.filter(pk=self.post.id).delete()
+        response = self.authorized_user.get(index_page)
+        self.assertContains(response, self.post.text)
+        self.assertContains(response, f'Пользователь: {self.user.username}')
+        self.assertNotContains(response, '<!--personalized:')
+
 
 class PaginatorViewTest(TestCase):
     """Класс тестирования работы шаблона пагинатора
@@ -239,6 +286,9 @@ class PaginatorViewTest(TestCase):
                 group=cls.group,
             )
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         """Первая страница index содержит десять записей."""
         pages_with_pagination = [
@@ -269,6 +319,57 @@ class PaginatorViewTest(TestCase):
                     len(response.context['page_obj']), POSTS_FOR_TESTING
                 )
 
+    def test_fragment_continues_first_page(self):
+        """Фрагмент отдаёт только карточки постов после курсора."""
+        last_on_first_page = Post.objects.order_by(*FEED_ORDERING)[
+            PAGIN_PAGES - 1
+        ]
+        fragments = [
+            reverse('posts:index_fragment'),
+            reverse('posts:group_fragment', args=(self.group.slug,)),
+            reverse('posts:profile_fragment', args=(self.author,)),
+        ]
+        for address in fragments:
+            with self.subTest(address=address):
+                response = self.client.get(
+                    address, {'after': feed_cursor(last_on_first_page)}
+                )
+                self.assertEqual(
+                    len(response.context['posts'].object_list),
+                    POSTS_FOR_TESTING,
+                )
+                self.assertNotContains(response, '<header>')
+                self.assertFalse(response.has_header('X-Next-Cursor'))
+
+    def test_backdated_post_is_not_lost_at_page_seam(self):
+        """Пост с более ранней датой, но большим pk попадает
+        во фрагмент ровно один раз."""
+        backdated = Post.objects.create(
+            text='Задним числом', author=self.author
+        )
+        Post.objects.filter(pk=backdated.pk).update(
+            pub_date=Post.objects.earliest('pub_date').pub_date
+            - dt.timedelta(days=1)
+        )
+        page = self.client.get(reverse('posts:index'))
+        cursor = re.search(
+            r'data-cursor="([^"]+)"', page.content.decode()
+        ).group(1)
+        fragment = self.client.get(
+            reverse('posts:index_fragment'), {'after': html.unescape(cursor)}
+        )
+        shown = [post.pk for post in page.context['page_obj']] + [
+            post.pk for post in fragment.context['posts'].object_list
+        ]
+        self.assertEqual(
+            shown,
+            list(
+                Post.objects.order_by(*FEED_ORDERING).values_list(
+                    'pk', flat=True
+                )
+            ),
+        )
+
 
 class FollowTests(TestCase):
     """Тесты проверки работы механизма подписки на авторов"""
@@ -345,3 +446,389 @@ class FollowTests(TestCase):
         response = self.authorized_follower.get('/follow/')
         following_index = response.context['page_obj'][0]
         self.assertNotEqual(following_post, following_index)
+
+    def test_followers_and_following_lists(self):
+        """Списки подписчиков и подписок выводят нужных пользователей."""
+        Follow.objects.create(user=self.follower, author=self.following)
+        response = self.authorized_following.get(
+            reverse(
+                'posts:followers',
+                kwargs={'username': self.following.username},
+            )
+        )
+        self.assertEqual(response.context['people'], [self.follower])
+        response = self.authorized_following.get(
+            reverse(
+                'posts:following',
+                kwargs={'username': self.follower.username},
+            )
+        )
+        self.assertEqual(response.context['people'], [self.following])
+
+    def test_followers_list_cursor_pagination(self):
+        """Список подписчиков листается курсором after."""
+        for number in range(PAGIN_PAGES + 1):
+            user = User.objects.create_user(username=f'reader{number}')
+            Follow.objects.create(user=user, author=self.following)
+        url = reverse(
+            'posts:followers', kwargs={'username': self.following.username}
+        )
+        page = self.authorized_follower.get(url).context['page']
+        self.assertEqual(len(page), PAGIN_PAGES)
+        self.assertTrue(page.has_next())
+        next_page = self.authorized_follower.get(
+            url, {'after': page.next_cursor}
+        ).context['page']
+        self.assertEqual(len(next_page), 1)
+        self.assertFalse(next_page.has_next())
+
+    def test_follow_set_invalidated_on_follow(self):
+        """Кеш подписок сбрасывается при подписке и отписке."""
+        profile_url = reverse(
+            'posts:profile', kwargs={'username': self.following.username}
+        )
+        response = self.authorized_follower.get(profile_url)
+        self.assertFalse(response.context['following'])
+        self.authorized_follower.get(
+            reverse(
+                'posts:profile_follow',
+                kwargs={'username': self.following.username},
+            )
+        )
+        response = self.authorized_follower.get(profile_url)
+        self.assertTrue(response.context['following'])
+        self.authorized_follower.get(
+            reverse(
+                'posts:profile_unfollow',
+                kwargs={'username': self.following.username},
+            )
+        )
+        response = self.authorized_follower.get(profile_url)
+        self.assertFalse(response.context['following'])
+
+
+class TrendingTests(TestCase):
+    """Тесты ленты популярных постов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {number}')
+            for number in range(PAGIN_PAGES + 1)
+        ]
+
+    def test_commented_post_goes_up(self):
+        """Пост с новым комментарием поднимается в ленте популярного."""
+        commented = self.posts[0]
+        Comment.objects.create(
+            post=commented, author=self.author, text='Комментарий'
+        )
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['page'].object_list[0], commented)
+
+    def test_trending_cursor_pagination(self):
+        """Лента популярного листается курсором без повторов."""
+        url = reverse('posts:trending')
+        page = self.client.get(url).context['page']
+        self.assertEqual(len(page), PAGIN_PAGES)
+        next_page = self.client.get(url, {'after': page.next_cursor}).context[
+            'page'
+        ]
+        self.assertEqual(
+            set(page.object_list) | set(next_page.object_list),
+            set(self.posts),
+        )
+
+
+class SearchTests(TestCase):
+    """Тесты поиска постов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.found = Post.objects.create(author=cls.author, text='Про котов')
+        cls.other = Post.objects.create(author=cls.author, text='Про собак')
+
+    def test_search_finds_matching_posts(self):
+        """Поиск выводит только посты с искомым текстом."""
+        response = self.client.get(reverse('posts:search'), {'q': 'котов'})
+        self.assertEqual(list(response.context['page_obj']), [self.found])
+
+    def test_empty_query_returns_nothing(self):
+        response = self.client.get(reverse('posts:search'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+
+class NotificationTests(TransactionTestCase):
+    """Тесты уведомлений и счётчика непрочитанных. Счётчик меняется
+    в on_commit, поэтому нужны настоящие транзакции."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(author=self.author, text='Пост')
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_comment_and_follow_notify_author(self):
+        """Комментарий и подписка создают уведомления автору,
+        повторная подписка — нет."""
+        self.reader_client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Отлично'},
+        )
+        follow_url = reverse('posts:profile_follow', args=('author',))
+        self.reader_client.get(follow_url)
+        self.reader_client.get(follow_url)
+        self.assertEqual(
+            sorted(self.author.notifications.values_list('kind', flat=True)),
+            [Notification.COMMENT, Notification.FOLLOW],
+        )
+
+    def test_stale_follow_cache_does_not_repeat_notification(self):
+        """Повторная подписка не уведомляет автора, даже если
+        кеш подписок устарел."""
+        follow_url = reverse('posts:profile_follow', args=('author',))
+        self.reader_client.get(follow_url)
+        cache.set(FOLLOW_SET_KEY.format(self.reader.pk), frozenset())
+        self.reader_client.get(follow_url)
+        self.assertEqual(
+            self.author.notifications.filter(kind=Notification.FOLLOW).count(),
+            1,
+        )
+
+    def test_unread_badge_uses_cached_counter(self):
+        """Счётчик в шапке меняется без пересчёта строк
+        и сбрасывается на странице уведомлений."""
+        url = reverse('posts:follow_index')
+        badge = '<span class="badge bg-danger">1</span>'
+        self.assertNotContains(self.author_client.get(url), badge)
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=('author',))
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.author.pk), 1)
+        self.assertContains(self.author_client.get(url), badge)
+        response = self.author_client.get(reverse('posts:notifications'))
+        self.assertEqual(len(response.context['page'].object_list), 1)
+        self.assertFalse(self.author.notifications.filter(is_read=False))
+        self.assertNotContains(self.author_client.get(url), badge)
+
+    def test_unread_counter_follows_deletions(self):
+        """Счётчик не учитывает уведомления удалённого поста
+        и уведомления от удаляемого пользователя."""
+        self.reader_client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Отлично'},
+        )
+        self.assertEqual(unread_count(self.author.pk), 1)
+        purge_post(self.post.pk, chunk_size=10)
+        self.assertEqual(unread_count(self.author.pk), 0)
+
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=('author',))
+        )
+        self.assertEqual(unread_count(self.author.pk), 1)
+        schedule_deletion(self.reader)
+        self.assertEqual(unread_count(self.author.pk), 0)
+
+
+@override_settings(SSE_HEARTBEAT=0.05, SSE_MAX_DURATION=0.1)
+class LiveEventsTests(TestCase):
+    """Тесты потоков событий для открытых страниц"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='live')
+        cls.post = Post.objects.create(
+            author=cls.author, text='Пост', group=cls.group
+        )
+
+    def test_post_page_subscribes_to_comments(self):
+        """Страница поста слушает поток своих комментариев."""
+        url = reverse('posts:post_events', args=(self.post.pk,))
+        self.assertContains(
+            self.client.get(
+                reverse('posts:post_detail', args=(self.post.pk,))
+            ),
+            url,
+        )
+        response = self.client.get(url)
+        publish(post_channel(self.post.pk), 'comment', {'id': 1})
+        body = b''.join(response.streaming_content).decode()
+        response.close()
+        self.assertIn('event: comment', body)
+
+    def test_follow_events_require_login(self):
+        response = self.client.get(reverse('posts:follow_events'))
+        self.assertEqual(response.status_code, 302)
+
+
+class TagTests(TestCase):
+    """Тесты хештегов и упоминаний"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hashtag_feed_and_mentions(self):
+        """Пост попадает в ленту хештега, упомянутый получает
+        уведомление, ссылки хранятся в text_html."""
+        post = Post.objects.create(
+            author=self.author, text='Про #Котики для @reader.'
+        )
+        url = reverse('posts:tag', args=('котики',))
+        response = self.client.get(url)
+        self.assertEqual(list(response.context['page']), [post])
+        self.assertIn(f'<a href="{url}">#Котики</a>', post.text_html)
+        self.assertEqual(
+            list(self.reader.notifications.values_list('kind', flat=True)),
+            [Notification.MENTION],
+        )
+
+    def test_edit_updates_tags_without_repeat_mentions(self):
+        """Правка текста обновляет хештеги, но не повторяет
+        уведомления об уже упомянутых."""
+        post = Post.objects.create(author=self.author, text='#один @reader')
+        post.text = '#два @reader'
+        post.save()
+        names = Tag.objects.filter(post_tags__post=post).values_list(
+            'name', flat=True
+        )
+        self.assertEqual(list(names), ['два'])
+        self.assertEqual(self.reader.notifications.count(), 1)
+
+    def test_links_match_extracted_tags(self):
+        """Ссылками становятся только извлечённые хештеги
+        и существующие пользователи."""
+        long_tag = 'а' * 51
+        post = Post.objects.create(
+            author=self.author,
+            text=f'AT&#tag #{long_tag} @reader @ghost <b>',
+        )
+        names = Tag.objects.filter(post_tags__post=post).values_list(
+            'name', flat=True
+        )
+        self.assertEqual(list(names), ['tag'])
+        self.assertIn(
+            'AT&amp;<a href="{}">#tag</a>'.format(
+                reverse('posts:tag', args=('tag',))
+            ),
+            post.text_html,
+        )
+        self.assertNotIn(long_tag[:50] + '</a>', post.text_html)
+        profile_url = reverse('posts:profile', args=('reader',))
+        self.assertIn(profile_url, post.text_html)
+        ghost_url = profile_url.replace('reader', 'ghost')
+        self.assertNotIn(ghost_url, post.text_html)
+        self.assertIn('&lt;b&gt;', post.text_html)
+
+    def test_mentions_are_capped(self):
+        """Уведомления получают не больше MENTIONS_PER_POST
+        упомянутых, первых по тексту."""
+        users = [
+            User.objects.create_user(username=f'user{i}')
+            for i in range(MENTIONS_PER_POST + 5)
+        ]
+        Post.objects.create(
+            author=self.author,
+            text=' '.join(f'@{user.username}' for user in users),
+        )
+        notified = Notification.objects.filter(kind=Notification.MENTION)
+        self.assertEqual(notified.count(), MENTIONS_PER_POST)
+        self.assertFalse(notified.filter(recipient=users[-1]).exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TakeoutTests(TestCase):
+    """Тесты выгрузки данных пользователя в zip-архив."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='takeout.gif',
+                content=b'GIF89a-image',
+                content_type='image/gif',
+            ),
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.author, text='Комментарий'
+        )
+        Post.objects.create(author=cls.stranger, text='Чужой пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def download(self):
+        response = self.client.get(
+            reverse('posts:takeout', args=(self.author.username,))
+        )
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+
+    def test_archive_contains_rows_and_media(self):
+        archive = self.download()
+        self.assertIsNone(archive.testzip())
+        posts = [
+            json.loads(line)
+            for line in archive.read('posts.jsonl').decode().splitlines()
+        ]
+        self.assertEqual([row['id'] for row in posts], [self.post.pk])
+        comments = archive.read('comments.jsonl').decode().splitlines()
+        self.assertEqual(json.loads(comments[0])['text'], 'Комментарий')
+        self.assertEqual(
+            archive.read(f'media/{self.post.image.name}'), b'GIF89a-image'
+        )
+
+    def test_missing_media_is_skipped(self):
+        self.post.image.storage.delete(self.post.image.name)
+        archive = self.download()
+        self.assertEqual(archive.namelist(), ['posts.jsonl', 'comments.jsonl'])
+
+    def test_staff_exports_account_pending_deletion(self):
+        """Персонал выгружает данные удаляемого аккаунта, хотя
+        на сайте они уже скрыты."""
+        schedule_deletion(self.author)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        archive = self.download()
+        self.assertEqual(len(archive.read('posts.jsonl').splitlines()), 1)
+        self.assertEqual(len(archive.read('comments.jsonl').splitlines()), 1)
+
+    def test_rows_are_read_in_batches(self):
+        for number in range(4):
+            Post.objects.create(author=self.author, text=str(number))
+        rows = list(batched(Post.all_objects.values('id'), chunk_size=2))
+        self.assertEqual(len(rows), Post.all_objects.count())
+
+    def test_foreign_takeout_is_forbidden(self):
+        self.client.force_login(self.stranger)
+        response = self.client.get(
+            reverse('posts:takeout', args=(self.author.username,))
+        )
+        self.assertRedirects(
+            response, reverse('posts:profile', args=(self.author.username,))
+        )
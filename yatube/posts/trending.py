@@ -0,0 +1,42 @@
+import math
+
+from django.db import transaction
+
+from .constants import HOT_COMMENT_WEIGHT, HOT_EPOCH, HOT_HALF_LIFE
+
+# Постоянная затухания: вес события уменьшается вдвое
+# каждые HOT_HALF_LIFE секунд.
+DECAY = math.log(2) / HOT_HALF_LIFE
+
+
+def event_score(moment, weight=1):
+    """Логарифм веса события в момент moment.
+
+    Вместо того чтобы уменьшать все оценки со временем,
+    новым событиям даётся вес exp(DECAY * t): порядок постов
+    получается тем же, а сохранённые оценки не нужно пересчитывать.
+    """
+    return math.log(weight) + DECAY * (moment - HOT_EPOCH).total_seconds()
+
+
+def add_scores(first, second):
+    """Логарифм суммы весов, заданных логарифмами (logaddexp)."""
+    high, low = max(first, second), min(first, second)
+    return high + math.log1p(math.exp(low - high))
+
+
+def bump_post(post_id, moment, weight=HOT_COMMENT_WEIGHT):
+    """Увеличивает оценку поста на вес события в момент moment."""
+    from .models import Post
+
+    with transaction.atomic():
+        post = (
+            Post.all_objects.select_for_update()
+            .only('hot_score')
+            .get(pk=post_id)
+        )
+        Post.all_objects.filter(pk=post_id).update(
+            hot_score=add_scores(
+                post.hot_score, event_score(moment, weight)
+            )
+        )
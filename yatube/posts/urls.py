@@ -6,8 +6,28 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('fragment/', views.index_fragment, name='index_fragment'),
+    path('trending/', views.trending, name='trending'),
+    path('search/', views.search, name='search'),
+    path('tags/<str:name>/', views.tag_posts, name='tag'),
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path(
+        'group/<slug:slug>/fragment/',
+        views.group_fragment,
+        name='group_fragment',
+    ),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/fragment/',
+        views.profile_fragment,
+        name='profile_fragment',
+    ),
+    path(
+        'profile/<str:username>/takeout/',
+        views.takeout,
+        name='takeout',
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
@@ -15,6 +35,13 @@ urlpatterns = [
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('events/', views.events, name='events'),
+    path('follow/events/', views.follow_events, name='follow_events'),
+    path('follow/fragment/', views.follow_fragment, name='follow_fragment'),
+    path(
+        'posts/<int:post_id>/events/', views.post_events, name='post_events'
+    ),
+    path('notifications/', views.notifications, name='notifications'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -25,4 +52,14 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow',
     ),
+    path(
+        'profile/<str:username>/followers/',
+        views.followers,
+        name='followers',
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.following,
+        name='following',
+    ),
 ]
@@ -1,13 +1,158 @@
-from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
-from .constants import PAGIN_PAGES
+from core.paginator import EstimatedCountPaginator
 
+from .constants import PAGIN_PAGES, RECOMMENDATIONS_COUNT, SEARCH_CONFIG
+from .models import Post, pending_user_deletions
 
-def page_posts_paginator(request, posts):
+
+def page_posts_paginator(request, posts, count=None):
     """Функция page_posts_paginator позволяет настроить вывод
     требуемого количества постов на страницу,
-    количество указано в константе PAGIN_PAGES."""
-    paginator = Paginator(posts, PAGIN_PAGES)
+    количество указано в константе PAGIN_PAGES.
+    Если общее количество постов уже известно, его можно
+    передать в count, чтобы не выполнять отдельный COUNT;
+    иначе для больших лент количество оценивается."""
+    paginator = EstimatedCountPaginator(posts, PAGIN_PAGES)
+    if count is not None:
+        paginator.count = count
     page_number = request.GET.get('page')
 
     return paginator.get_page(page_number)
+
+
+class KeysetPage:
+    """Страница курсорной пагинации: элементы и курсор
+    для запроса следующей страницы (None, если она последняя)."""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def keyset_paginator(request, queryset, per_page=PAGIN_PAGES, field=None):
+    """Функция keyset_paginator выводит страницу от курсора
+    из параметра after по убыванию первичного ключа или поля
+    field (с первичным ключом для разрешения равенства).
+    В отличие от page_posts_paginator не выполняет COUNT
+    и OFFSET, поэтому глубокие страницы не становятся медленнее."""
+    cursor = request.GET.get('after', '')
+    if field is None:
+        queryset = queryset.order_by('-pk')
+        if cursor.isdigit():
+            queryset = queryset.filter(pk__lt=int(cursor))
+    else:
+        queryset = queryset.order_by(f'-{field}', '-pk')
+        value, _, pk = cursor.rpartition('_')
+        if value and pk.isdigit():
+            try:
+                value = queryset.model._meta.get_field(field).to_python(
+                    value
+                )
+            except ValidationError:
+                value = None
+            if value is not None:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lt': value})
+                    | Q(**{field: value, 'pk__lt': int(pk)})
+                )
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        next_cursor = keyset_cursor(items[per_page - 1], field)
+
+    return KeysetPage(items[:per_page], next_cursor)
+
+
+def keyset_cursor(obj, field=None):
+    """Курсор keyset_paginator, указывающий на объект obj."""
+    if field is None:
+        return obj.pk
+    value = getattr(obj, field)
+    if hasattr(value, 'isoformat'):
+        # repr даты не разбирается to_python, ISO — разбирается.
+        value = value.isoformat()
+    else:
+        value = repr(value)
+    return f'{value}_{obj.pk}'
+
+
+def count_subquery(queryset, field, outer='pk'):
+    """Подзапрос с количеством строк queryset, у которых field
+    совпадает с полем outer внешнего запроса. Позволяет получить
+    несколько счётчиков одним запросом без размножения строк JOIN-ами."""
+    counts = (
+        queryset.filter(**{field: OuterRef(outer)})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def recommended_authors(user):
+    """Рекомендации авторов для подписки, заранее рассчитанные
+    командой build_recommendations: одно чтение по индексу.
+    Авторы, на которых пользователь подписался после расчёта,
+    и авторы из очереди удаления отбрасываются при чтении."""
+    if not user.is_authenticated:
+        return ()
+    return (
+        user.recommendations.exclude(author_id__in=followed_author_ids(user))
+        .exclude(author__in=pending_user_deletions())
+        .select_related('author')[:RECOMMENDATIONS_COUNT]
+    )
+
+
+FOLLOW_SET_KEY = 'follow_set.{}'
+
+
+def followed_author_ids(user):
+    """Множество id авторов, на которых подписан пользователь.
+
+    Загружается одним запросом и кешируется, так что состояние
+    подписки для любого числа авторов проверяется без запросов.
+    Кеш сбрасывается сигналами при изменении подписок.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    key = FOLLOW_SET_KEY.format(user.pk)
+    author_ids = cache.get(key)
+    if author_ids is None:
+        author_ids = frozenset(
+            user.follower.values_list('author_id', flat=True)
+        )
+        cache.set(key, author_ids)
+    return author_ids
+
+
+def invalidate_followed_author_ids(user_id):
+    cache.delete(FOLLOW_SET_KEY.format(user_id))
+
+
+def search_posts(query):
+    """Посты, содержащие query. На PostgreSQL — полнотекстовый
+    поиск с морфологией по GIN-индексу, на SQLite — подстрока."""
+    if not query:
+        return Post.objects.none()
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        return Post.objects.annotate(
+            search=SearchVector('text', config=SEARCH_CONFIG)
+        ).filter(search=SearchQuery(query, config=SEARCH_CONFIG))
+    return Post.objects.filter(text__icontains=query)
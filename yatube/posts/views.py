@@ -1,16 +1,46 @@
 from django.contrib.auth.decorators import login_required
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
-
-from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Follow
-from .utils import page_posts_paginator
 
+from core.db.sqlite import retry_on_lock
+from core.personalization import cache_shared_page
+from core.ratelimit import ratelimit
+from core.sse import sse_response
 
-@cache_page(20, key_prefix='index_page')
+from .constants import FEED_CURSOR_FIELD, FEED_ORDERING
+from .forms import PostForm, CommentForm
+from .events import POSTS_CHANNEL, author_channel, post_channel
+from .models import (
+    Comment,
+    Follow,
+    Group,
+    Notification,
+    Post,
+    Tag,
+    User,
+    pending_user_deletions,
+    visible_users,
+)
+from .notifications import mark_all_read, notify
+from .takeout import takeout_stream
+from .tasks import make_thumbnail
+from .utils import (
+    page_posts_paginator,
+    keyset_paginator,
+    count_subquery,
+    followed_author_ids,
+    recommended_authors,
+    search_posts,
+)
+
+
+@cache_shared_page(20, key_prefix='index_page')
 def index(request):
     """View-метод вывода постов на главной странице."""
-    posts = Post.objects.all()
+    posts = Post.objects.select_related('author', 'group').order_by(
+        *FEED_ORDERING
+    )
 
     context = {
         'page_obj': page_posts_paginator(request, posts),
@@ -24,7 +54,9 @@ def group_posts(request, slug):
     Использует выборку объектов из модели Post,
     передает информацию из БД в шаблон."""
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author', 'group')
+    posts = group.posts.select_related('author', 'group').order_by(
+        *FEED_ORDERING
+    )
     context = {
         'group': group,
         'page_obj': page_posts_paginator(request, posts),
@@ -33,21 +65,54 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+GROUP_ORDERINGS = {
+    'activity': F('stats__last_post_at').desc(nulls_last=True),
+    'posts': F('stats__post_count').desc(nulls_last=True),
+    'authors': F('stats__author_count').desc(nulls_last=True),
+    'title': F('title').asc(),
+}
+
+
+@cache_shared_page(60, key_prefix='group_index')
+def group_index(request):
+    """View-метод вывода каталога групп.
+    Статистика берётся из GroupStats, поэтому страница
+    не считает посты каждой группы при выводе."""
+    sort = request.GET.get('sort')
+    if sort not in GROUP_ORDERINGS:
+        sort = 'activity'
+    groups = Group.objects.select_related('stats').order_by(
+        GROUP_ORDERINGS[sort], 'pk'
+    )
+    context = {
+        'page_obj': page_posts_paginator(request, groups),
+        'sort': sort,
+    }
+
+    return render(request, 'posts/group_index.html', context)
+
+
 def profile(request, username):
     """View-метод вывода данных о пользователе.
     Вывыодит общее количество постов, имя пользователя.
     """
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('author', 'group')
-    following = False
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user, author=author
-        ).exists()
+    authors = visible_users().annotate(
+        posts_count=count_subquery(Post.objects, 'author'),
+        followers_count=count_subquery(Follow.objects, 'author'),
+        subscriptions_count=count_subquery(Follow.objects, 'user'),
+        comments_count=count_subquery(Comment.objects, 'author'),
+    )
+    author = get_object_or_404(authors, username=username)
+    posts = author.posts.select_related('author', 'group').order_by(
+        *FEED_ORDERING
+    )
     context = {
         'author': author,
-        'page_obj': page_posts_paginator(request, posts),
-        'following': following,
+        'page_obj': page_posts_paginator(
+            request, posts, count=author.posts_count
+        ),
+        'following': author.pk in followed_author_ids(request.user),
+        'recommendations': recommended_authors(request.user),
     }
 
     return render(request, 'posts/profile.html', context)
@@ -59,11 +124,18 @@ def post_detail(request, post_id):
         Post.objects.select_related(
             'author',
             'group',
+        ).annotate(
+            author_posts_count=count_subquery(
+                Post.objects, 'author', 'author'
+            ),
+            author_comments_count=count_subquery(
+                Comment.objects, 'author', 'author'
+            ),
         ),
         pk=post_id,
     )
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = post.comments.select_related('author')
     context = {
         'post': post,
         'form': form,
@@ -73,7 +145,33 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    """View-метод поиска постов по тексту.
+    На PostgreSQL использует полнотекстовый поиск по tsvector."""
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(query).select_related('author', 'group')
+    context = {
+        'query': query,
+        'page_obj': page_posts_paginator(request, posts),
+    }
+
+    return render(request, 'posts/search.html', context)
+
+
+def trending(request):
+    """View-метод вывода популярных постов.
+    Посты упорядочены по оценке hot_score, которая
+    обновляется при каждом новом комментарии."""
+    posts = Post.objects.select_related('author', 'group')
+    context = {
+        'page': keyset_paginator(request, posts, field='hot_score'),
+    }
+
+    return render(request, 'posts/trending.html', context)
+
+
 @login_required
+@ratelimit('post_create')
 def post_create(request):
     """Функция создания поста"""
     form = PostForm(
@@ -84,6 +182,8 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if post.image:
+            make_thumbnail.delay(post.pk)
         return redirect('posts:profile', request.user)
 
     return render(request, 'posts/post_create.html', {'form': form})
@@ -103,6 +203,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         post.save()
+        if 'image' in form.changed_data and post.image:
+            make_thumbnail.delay(post.pk)
         return redirect('posts:post_detail', post_id)
     context = {
         'post': post,
@@ -114,6 +216,8 @@ def post_edit(request, post_id):
 
 
 @login_required
+@ratelimit('add_comment')
+@retry_on_lock()
 def add_comment(request, post_id):
     """Функция добавления комментария"""
     post = get_object_or_404(Post, id=post_id)
@@ -130,29 +234,197 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     """Функция перехода на страницу подписок"""
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = (
+        Post.objects.filter(author__following__user=request.user)
+        .select_related('author', 'group')
+        .order_by(*FEED_ORDERING)
+    )
     context = {
         'page_obj': page_posts_paginator(request, posts),
+        'recommendations': recommended_authors(request.user),
     }
 
     return render(request, 'posts/follow.html', context)
 
 
 @login_required
+@ratelimit('profile_follow', methods=None)
+@retry_on_lock()
 def profile_follow(request, username):
     """Функция подписки на автора"""
-    author = get_object_or_404(User, username=username)
-    follower = Follow.objects.filter(user=request.user, author=author)
-    if request.user != author and not follower.exists():
-        Follow.objects.create(user=request.user, author=author)
+    author = get_object_or_404(visible_users(), username=username)
+    if request.user != author:
+        # Новизна подписки определяется по базе, а не по кешу:
+        # устаревший кеш повторил бы уведомление автору.
+        _, created = Follow.objects.get_or_create(
+            user=request.user, author=author
+        )
+        if created:
+            notify(author.pk, request.user.pk, Notification.FOLLOW)
 
     return redirect('posts:profile', username=author)
 
 
 @login_required
+@retry_on_lock()
 def profile_unfollow(request, username):
     """Функция отписки от автора"""
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
 
     return redirect('posts:profile', username=author)
+
+
+def followers(request, username):
+    """Функция вывода подписчиков автора"""
+    author = get_object_or_404(visible_users(), username=username)
+    follows = author.following.exclude(
+        user__in=pending_user_deletions()
+    ).select_related('user')
+    page = keyset_paginator(request, follows)
+    context = {
+        'author': author,
+        'page': page,
+        'people': [follow.user for follow in page],
+        'followed_ids': followed_author_ids(request.user),
+        'title': 'Подписчики',
+    }
+
+    return render(request, 'posts/follow_list.html', context)
+
+
+def following(request, username):
+    """Функция вывода авторов, на которых подписан пользователь"""
+    author = get_object_or_404(visible_users(), username=username)
+    follows = author.follower.exclude(
+        author__in=pending_user_deletions()
+    ).select_related('author')
+    page = keyset_paginator(request, follows)
+    context = {
+        'author': author,
+        'page': page,
+        'people': [follow.author for follow in page],
+        'followed_ids': followed_author_ids(request.user),
+        'title': 'Подписки',
+    }
+
+    return render(request, 'posts/follow_list.html', context)
+
+
+@login_required
+def notifications(request):
+    """Функция вывода уведомлений пользователя.
+    Открытие страницы отмечает все уведомления прочитанными."""
+    page = keyset_paginator(
+        request,
+        request.user.notifications.exclude(
+            actor__in=pending_user_deletions()
+        ).select_related('actor', 'post'),
+    )
+    mark_all_read(request.user.pk)
+    context = {
+        'page': page,
+    }
+
+    return render(request, 'posts/notifications.html', context)
+
+
+def tag_posts(request, name):
+    """Функция вывода постов с хештегом.
+    Посты выбираются по индексу таблицы хештегов, а не поиском
+    по тексту, и листаются курсором."""
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts = Post.objects.filter(post_tags__tag=tag).select_related(
+        'author', 'group'
+    )
+    context = {
+        'tag': tag,
+        'page': keyset_paginator(request, posts),
+    }
+
+    return render(request, 'posts/tag.html', context)
+
+
+def post_fragment(request, posts):
+    """Следующая порция карточек постов для бесконечной прокрутки.
+
+    Возвращает только HTML карточек без шапки и разметки
+    страницы; курсор продолжения передаётся в X-Next-Cursor.
+    """
+    # Курсор по тем же полям, что и FEED_ORDERING первой страницы,
+    # иначе на стыке страниц посты теряются или повторяются.
+    page = keyset_paginator(request, posts, field=FEED_CURSOR_FIELD)
+    response = render(
+        request, 'posts/includes/post_fragment.html', {'posts': page}
+    )
+    if page.has_next():
+        response['X-Next-Cursor'] = page.next_cursor
+    return response
+
+
+def index_fragment(request):
+    return post_fragment(
+        request, Post.objects.select_related('author', 'group')
+    )
+
+
+def group_fragment(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return post_fragment(
+        request, group.posts.select_related('author', 'group')
+    )
+
+
+def profile_fragment(request, username):
+    author = get_object_or_404(visible_users(), username=username)
+    return post_fragment(
+        request, author.posts.select_related('author', 'group')
+    )
+
+
+@login_required
+def follow_fragment(request):
+    return post_fragment(
+        request,
+        Post.objects.filter(
+            author__following__user=request.user
+        ).select_related('author', 'group'),
+    )
+
+
+def events(request):
+    """Поток событий о новых постах для главной страницы."""
+    return sse_response(request, (POSTS_CHANNEL,))
+
+
+@login_required
+def follow_events(request):
+    """Поток событий о новых постах авторов из подписок."""
+    return sse_response(
+        request,
+        [author_channel(pk) for pk in followed_author_ids(request.user)],
+    )
+
+
+def post_events(request, post_id):
+    """Поток событий о новых комментариях к посту."""
+    return sse_response(request, (post_channel(post_id),))
+
+
+@login_required
+@ratelimit('takeout', methods=None)
+def takeout(request, username):
+    """Скачивание архива с постами, комментариями и картинками.
+
+    Свой архив доступен пользователю, чужие — только персоналу.
+    """
+    author = get_object_or_404(User, username=username)
+    if request.user != author and not request.user.is_staff:
+        return redirect('posts:profile', username=username)
+    response = StreamingHttpResponse(
+        takeout_stream(author), content_type='application/zip'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{author.username}-takeout.zip"'
+    )
+    return response
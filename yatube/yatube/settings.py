@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -32,10 +33,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.static.PrecompressedStaticMiddleware',
+    'core.middleware.compression.CompressionMiddleware',
+    'core.middleware.replicas.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.concurrency.WriteConcurrencyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -71,6 +76,58 @@ DATABASES = {
     }
 }
 
+# Настройки соединений с SQLite для конкурентной записи:
+# WAL позволяет читать во время записи, busy_timeout — ждать
+# блокировку вместо немедленной ошибки.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Профиль PostgreSQL для продакшена: YATUBE_DB=postgresql.
+# При работе через PgBouncer в режиме transaction задайте
+# POSTGRES_PGBOUNCER=1: серверные курсоры там недоступны.
+if os.environ.get('YATUBE_DB') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'core.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'yatube'),
+        'USER': os.environ.get('POSTGRES_USER', 'yatube'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('POSTGRES_CONN_MAX_AGE', 60)),
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.environ.get('POSTGRES_PGBOUNCER') == '1'
+        ),
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', 20)),
+        },
+    }
+
+# Локальная имитация реплик: YATUBE_SQLITE_REPLICAS=2 добавляет
+# базы replica1 и replica2, которые наполняет команда
+# simulate_replication.
+REPLICA_COUNT = int(os.environ.get('YATUBE_SQLITE_REPLICAS', 0))
+
+DATABASE_REPLICAS = [
+    f'replica{number}' for number in range(1, REPLICA_COUNT + 1)
+]
+
+for replica in DATABASE_REPLICAS:
+    DATABASES[replica] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'db_{replica}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = 10
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,6 +160,25 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+STATIC_MAX_AGE = 60
+
+STATIC_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+COMPRESSION_MIN_SIZE = 200
+
+COMPRESSION_LEVELS = {
+    'br': 5,
+    'gzip': 6,
+}
+
+# Наибольшая длина случайного дополнения сжатых HTML-страниц
+# с токеном CSRF (защита от BREACH), 0 — без дополнения.
+COMPRESSION_PADDING = 32
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -111,15 +187,97 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+COUNT_ESTIMATE_THRESHOLD = 10000
+
+COUNT_CACHE_TIMEOUT = 60
+
+COUNTED_MODELS = ['posts.Post', 'posts.Comment', 'posts.Follow']
+
+TEXT_RENDERER = 'posts.rendering.linked_text'
+
+SITE_URL = os.environ.get('YATUBE_SITE_URL', 'http://127.0.0.1:8000')
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# Лимиты запросов, кеш пользователей и счётчики уведомлений должны
+# быть общими для всех процессов сервера, поэтому в боевом режиме
+# нужен memcached. Кеш в памяти процесса годится только для
+# runserver и тестов (см. проверку core.W001).
+CACHE_LOCATION = os.environ.get('YATUBE_CACHE_LOCATION')
+
+SHARED_CACHE = bool(CACHE_LOCATION)
+
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': CACHE_LOCATION,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
+
+# Сессии и пользователь кешируются, только если кеш общий: иначе
+# другой процесс продолжит отдавать разлогиненную сессию или
+# пользователя со старым паролем и правами.
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db'
+    if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db'
+)
+
+AUTHENTICATION_BACKENDS = ['core.backends.CachedModelBackend']
+
+USER_CACHE_TIMEOUT = 60 * 5 if SHARED_CACHE else 0
+
+RATELIMITS = {
+    'post_create': '20/m',
+    'add_comment': '30/m',
+    'profile_follow': '60/m',
+    'signup': '10/h',
+    'takeout': '5/h',
 }
 
+WRITE_CONCURRENCY_LIMIT = 4
+
+WRITE_QUEUE_TIMEOUT = 2
+
+WRITE_LOCK_DIR = os.environ.get(
+    'YATUBE_WRITE_LOCK_DIR',
+    os.path.join(tempfile.gettempdir(), 'yatube-write-locks'),
+)
+
+TASK_WORKERS = 2
+
+TASK_POLL_INTERVAL = 1
+
+TASK_VISIBILITY_TIMEOUT = 60 * 5
+
+TASK_RETRY_DELAY = 10
+
+PUBSUB_BACKEND = os.environ.get(
+    'YATUBE_PUBSUB_BACKEND', 'core.pubsub.LocalBroker'
+)
+
+PUBSUB_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# Каждый поток событий занимает поток WSGI-сервера, поэтому лимит
+# на процесс должен быть заметно меньше числа его потоков.
+SSE_MAX_CONNECTIONS = int(os.environ.get('YATUBE_SSE_MAX_CONNECTIONS', 2))
+
+SSE_QUEUE_SIZE = 100
+
+SSE_HEARTBEAT = 15
+
+SSE_MAX_DURATION = 60
+
+SSE_RETRY_MS = 3000
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]